@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Benchmark peak memory of CSV ingestion: whole-file pandas vs streaming chunks.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ingest.py --rows 200000 800000 3200000
+
+Each measurement runs in a fresh subprocess so the reported peak RSS
+belongs to that ingestion mode alone. The pipeline mode also computes the
+statistics and outliers derived from the stored file at upload, as
+create_dataset does.
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TYPES = ['Reactor', 'Distillation Column', 'Heat Exchanger', 'Centrifugal Pump', 'Compressor']
+
+
+def generate_csv(path, rows):
+    """Write a synthetic equipment CSV with the given number of rows"""
+    rng = random.Random(42)
+    with open(path, 'w') as f:
+        f.write('Equipment Name,Type,Flowrate,Pressure,Temperature\n')
+        for i in range(rows):
+            eq_type = TYPES[i % len(TYPES)]
+            f.write(f"{eq_type}-{i:07d},{eq_type},{rng.uniform(50, 400):.2f},"
+                    f"{rng.uniform(0.5, 8):.2f},{rng.uniform(20, 200):.2f}\n")
+
+
+def run_legacy(source, destination):
+    """The original upload_csv path: read everything, then re-serialize it"""
+    import pandas as pd
+    df = pd.read_csv(source)
+    df['Flowrate'].mean(), df['Pressure'].mean(), df['Temperature'].mean()
+    df['Type'].value_counts().to_dict()
+    df.to_csv(destination, index=False)
+
+
+def run_streaming(source, destination):
+    from equipment.ingest import ingest_csv
+    with open(source, 'rb') as f:
+        aggregates = ingest_csv(f, destination)
+    aggregates.type_distribution()
+
+
+def run_pipeline(source, destination):
+    """Streaming ingestion plus everything create_dataset derives from the file before committing"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chemical_equipment.settings')
+    django.setup()
+    from equipment.anomalies import find_anomalies
+    from equipment.stats import compute_statistics
+    run_streaming(source, destination)
+    find_anomalies(destination, compute_statistics(destination))
+
+
+RUNNERS = {'legacy': run_legacy, 'streaming': run_streaming, 'pipeline': run_pipeline}
+
+
+def child(mode, source):
+    """Run one ingestion and print elapsed seconds and peak RSS in MB"""
+    destination = source + f'.{mode}.out'
+    start = time.perf_counter()
+    RUNNERS[mode](source, destination)
+    elapsed = time.perf_counter() - start
+    os.remove(destination)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.3f} {peak_kb / 1024:.1f}")
+
+
+def measure(mode, source):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, source],
+        text=True,
+    )
+    elapsed, peak_mb = output.split()
+    return float(elapsed), float(peak_mb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 400000, 1600000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'SOURCE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'rows':>10} {'file MB':>8} {'mode':>10} {'seconds':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            source = os.path.join(tmp, f'equipment_{rows}.csv')
+            generate_csv(source, rows)
+            size_mb = os.path.getsize(source) / (1024 * 1024)
+            for mode in RUNNERS:
+                elapsed, peak_mb = measure(mode, source)
+                print(f"{rows:>10} {size_mb:>8.1f} {mode:>10} {elapsed:>8.2f} {peak_mb:>12.1f}")
+            os.remove(source)
+
+
+if __name__ == '__main__':
+    main()
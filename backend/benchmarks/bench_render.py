@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Serialization throughput of dataset rows with each JSON renderer.
+
+Usage (from the backend directory):
+    python benchmarks/bench_render.py --rows 1000000
+
+Stores a synthetic dataset as the upload path does, then times what
+/api/dataset/<id>/ does after parsing parameters: query_rows plus
+rendering, for every MAX_PAGE_SIZE page of the dataset, once per
+renderer. The default JSONRenderer and
+ORJSONRenderer (?format=orjson) get rows as dicts; ColumnarJSONRenderer
+(?format=columnar) gets the Arrow table.
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from harness import equipment_csv
+
+from rest_framework.renderers import JSONRenderer
+
+from equipment.ingest import ingest_csv
+from equipment.queries import MAX_PAGE_SIZE, query_rows
+from equipment.renderers import ColumnarJSONRenderer, ORJSONRenderer
+from equipment.storage import DATASET_EXTENSION
+
+
+RENDERERS = [JSONRenderer, ORJSONRenderer, ColumnarJSONRenderer]
+
+
+def render(renderer_class, file_path):
+    """Render every page of the dataset; returns the total body size in bytes"""
+    renderer = renderer_class()
+    size = 0
+    offset = 0
+    while offset is not None:
+        result = query_rows(file_path, {'offset': offset, 'limit': MAX_PAGE_SIZE},
+                            as_table=getattr(renderer, 'columnar', False))
+        size += len(renderer.render(result, 'application/json', {}))
+        offset = result['next_offset']
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, f'bench{DATASET_EXTENSION}')
+        ingest_csv(io.BytesIO(equipment_csv(args.rows, 5)), file_path)
+
+        print(f"{'renderer':<22} {'MB':>8} {'seconds':>8} {'rows/s':>12} {'speedup':>8}")
+        baseline = None
+        for renderer_class in RENDERERS:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                size = render(renderer_class, file_path)
+                timings.append(time.perf_counter() - start)
+            seconds = statistics.median(timings)
+            baseline = baseline or seconds
+            print(f'{renderer_class.__name__:<22} {size / (1024 * 1024):>8.1f} {seconds:>8.2f} '
+                  f'{args.rows / seconds:>12,.0f} {baseline / seconds:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
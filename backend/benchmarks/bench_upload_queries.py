@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Regression benchmark: SQL queries issued per upload must not grow per row.
+
+Usage (from the backend directory):
+    python benchmarks/bench_upload_queries.py
+
+Uploads files with an increasing number of distinct equipment types, twice
+over, and fails if the per-type rows are not batched. Retention runs in a
+background sweep and is not part of the counted request. On
+SQLite bulk_create still splits large inserts to stay under the 999 bound
+parameter limit, so the allowance is one extra query per ROWS_PER_QUERY
+types for each of the PER_TYPE_TABLES; on PostgreSQL the count is constant.
+"""
+import sys
+import time
+
+from harness import benchmark_environment, equipment_csv
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+TYPE_COUNTS = [1, 10, 100, 1000, 5000]
+
+# Minimum number of per-type rows each INSERT must carry
+ROWS_PER_QUERY = 50
+# Tables written with one row per equipment type (distributions, type statistics)
+PER_TYPE_TABLES = 2
+
+
+def main():
+    with benchmark_environment() as client:
+        print(f"{'types':>6} {'queries':>8} {'seconds':>8}")
+        counts = []
+        for index, types in enumerate(TYPE_COUNTS * 2):
+            upload = SimpleUploadedFile(f'plant_{index}.csv', equipment_csv(max(types, 100), types, prefix=f'EQ{index}'))
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post('/api/upload/', {'file': upload}, format='multipart')
+            elapsed = time.perf_counter() - start
+            if response.status_code != 201:
+                print(f'Upload failed: {response.status_code} {response.content[:200]}')
+                return 1
+            counts.append(len(queries))
+            print(f'{types:>6} {len(queries):>8} {elapsed:>8.3f}')
+
+    # The second round runs against a populated history
+    steady = list(zip(TYPE_COUNTS, counts[len(TYPE_COUNTS):]))
+    baseline = steady[0][1]
+    for types, count in steady:
+        if count - baseline > PER_TYPE_TABLES * (types // ROWS_PER_QUERY):
+            print(f'FAIL: {count} queries for {types} types (baseline {baseline})')
+            return 1
+    print(f'OK: {baseline} queries per upload plus at most {PER_TYPE_TABLES} per {ROWS_PER_QUERY} types')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -112,6 +113,64 @@ STATIC_URL = 'static/'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache for summary/history responses; file-based so every worker process
+# sees the same entries and invalidations
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache'),
+    }
+}
+
+# Background ingestion
+# Uploads at least this large are parsed by a background worker pool and
+# POST /api/upload/ answers 202 with a job id to poll at /api/jobs/<id>/
+INGEST_ASYNC_THRESHOLD = 10 * 1024 * 1024  # bytes
+INGEST_WORKERS = 2
+# Jobs "running" for longer than this are assumed to have lost their worker
+# (e.g. a recycled process) and are requeued
+INGEST_JOB_TIMEOUT = 60 * 60  # seconds
+
+# Dataset retention, applied by a background sweep after each upload and by
+# `python manage.py sweep_retention`. Datasets beyond any HOT_* limit are
+# gzipped into MEDIA_ROOT/archive (their statistics stay in the database);
+# datasets beyond any MAX_* limit are deleted. None disables a limit.
+# *_BYTES limits count uncompressed dataset file sizes, newest first.
+# Time-series readings outlive their dataset until READINGS_DAYS old.
+DATASET_RETENTION = {
+    'HOT_COUNT': 5,
+    'HOT_DAYS': None,
+    'HOT_BYTES': None,
+    'MAX_COUNT': None,
+    'MAX_DAYS': 365,
+    'MAX_BYTES': None,
+    'READINGS_DAYS': 365,
+    # Hours a dataset restored from the archive stays uncompressed
+    'REHYDRATED_HOURS': 24,
+    # Hours after which a chunked upload session and its parts are deleted,
+    # whether or not it was finalized
+    'UPLOAD_SESSION_HOURS': 48,
+    # Sweep after every upload; disable to rely on the management command alone
+    'SWEEP_ON_UPLOAD': True,
+}
+
+# Outlier detection at upload, per equipment type and reading.
+# METHOD: 'zscore', 'iqr', 'either' or 'both' (flag only when both agree).
+# BASELINE_UPLOADS > 0 takes each type's mean and std from that many
+# previous uploads instead of the upload itself.
+ANOMALY_DETECTION = {
+    'METHOD': 'both',
+    'Z_THRESHOLD': 3.0,
+    'IQR_FACTOR': 1.5,
+    'BASELINE_UPLOADS': 0,
+    'MAX_PER_DATASET': 10000,
+}
+
+# Render each new dataset's PDF report in the background right after upload
+REPORT_PRERENDER = True
+# Worker processes that rasterize report charts
+REPORT_RENDER_PROCESSES = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
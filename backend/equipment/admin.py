@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import EquipmentDataset, EquipmentTypeDistribution
+from .models import (EquipmentDataset, EquipmentTypeDistribution, ColumnStatistics, TypeStatistics,
+                     EquipmentReading, AnomalousReading, IngestionJob, UploadSession)
 
 
 @admin.register(EquipmentDataset)
@@ -11,5 +12,45 @@ class EquipmentDatasetAdmin(admin.ModelAdmin):
 
 @admin.register(EquipmentTypeDistribution)
 class EquipmentTypeDistributionAdmin(admin.ModelAdmin):
-    list_display = ['dataset', 'equipment_type', 'count']
+    list_display = ['dataset', 'equipment_type', 'count', 'flowrate_min', 'flowrate_max',
+                    'pressure_min', 'pressure_max', 'temperature_min', 'temperature_max']
     list_filter = ['dataset', 'equipment_type']
+
+
+@admin.register(ColumnStatistics)
+class ColumnStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'column', 'count', 'min_value', 'max_value', 'mean', 'std', 'p50', 'p95', 'p99']
+    list_filter = ['dataset', 'column']
+
+
+@admin.register(TypeStatistics)
+class TypeStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'equipment_type', 'count', 'mean_flowrate', 'mean_pressure', 'mean_temperature']
+    list_filter = ['dataset', 'equipment_type']
+
+
+@admin.register(EquipmentReading)
+class EquipmentReadingAdmin(admin.ModelAdmin):
+    list_display = ['equipment_name', 'equipment_type', 'recorded_at', 'flowrate', 'pressure', 'temperature']
+    list_filter = ['equipment_type']
+    search_fields = ['equipment_name']
+
+
+@admin.register(AnomalousReading)
+class AnomalousReadingAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'equipment_name', 'equipment_type', 'metric', 'value', 'expected', 'zscore', 'method']
+    list_filter = ['metric', 'method', 'equipment_type']
+    search_fields = ['equipment_name']
+
+
+@admin.register(IngestionJob)
+class IngestionJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'progress', 'dataset', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['id', 'created_at', 'started_at', 'finished_at']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'total_size', 'chunk_size', 'job', 'created_by', 'created_at']
+    readonly_fields = ['id', 'created_at']
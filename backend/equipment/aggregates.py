@@ -0,0 +1,102 @@
+"""Cross-dataset per-type aggregates, computed by the database.
+
+EquipmentTypeDistribution stores additive aggregates (count, sum, sum of
+squares, min, max) per dataset and type, so combining any number of
+uploads is a single GROUP BY over those rows. Means and standard
+deviations are derived from the summed columns afterwards.
+"""
+import math
+from datetime import datetime, time
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import EquipmentTypeDistribution
+from .storage import NUMERIC_COLUMNS
+
+
+METRICS = [column.lower() for column in NUMERIC_COLUMNS]
+
+GROUPINGS = ['type', 'dataset', 'day', 'month']
+PERIODS = {
+    'day': TruncDay,
+    'month': TruncMonth,
+}
+
+
+def parse_moment(value, name):
+    """Aware datetime from an ISO datetime or date (midnight in the current time zone)"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"'{name}' must be an ISO date or datetime")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def summarize(row):
+    """Turn one group's summed columns into count/mean/std/min/max per metric"""
+    result = {key: value for key, value in row.items() if not key.startswith(tuple(METRICS))}
+    for metric in METRICS:
+        count = row[f'{metric}_count'] or 0
+        total = row[f'{metric}_sum'] or 0.0
+        squares = row[f'{metric}_sumsq'] or 0.0
+        mean = total / count if count else None
+        std = None
+        if count > 1:
+            # Clamp tiny negative variances caused by floating point cancellation
+            std = math.sqrt(max(squares - total * mean, 0.0) / (count - 1))
+        result[metric] = {
+            'count': count,
+            'mean': mean,
+            'std': std,
+            'min': row[f'{metric}_min'],
+            'max': row[f'{metric}_max'],
+        }
+    return result
+
+
+def type_aggregates(params):
+    """Aggregate readings per equipment type across datasets.
+
+    Parameters: type (comma-separated), since and until (ISO dates or
+    datetimes, matched against upload time) and group_by, one of type
+    (default), dataset, day or month. Raises ValueError for invalid
+    parameters.
+    """
+    grouping = params.get('group_by') or 'type'
+    if grouping not in GROUPINGS:
+        raise ValueError(f'group_by must be one of: {", ".join(GROUPINGS)}')
+
+    rows = EquipmentTypeDistribution.objects.all()
+    if params.get('type'):
+        rows = rows.filter(equipment_type__in=[value.strip() for value in params['type'].split(',')])
+    if params.get('since'):
+        rows = rows.filter(dataset__uploaded_at__gte=parse_moment(params['since'], 'since'))
+    if params.get('until'):
+        rows = rows.filter(dataset__uploaded_at__lt=parse_moment(params['until'], 'until'))
+
+    sums = {'count': Sum('count')}
+    for metric in METRICS:
+        sums[f'{metric}_count'] = Sum(f'{metric}_count')
+        sums[f'{metric}_sum'] = Sum(f'{metric}_sum')
+        sums[f'{metric}_sumsq'] = Sum(f'{metric}_sumsq')
+        sums[f'{metric}_min'] = Min(f'{metric}_min')
+        sums[f'{metric}_max'] = Max(f'{metric}_max')
+
+    group_fields = []
+    if grouping == 'dataset':
+        group_fields = ['dataset_id']
+    elif grouping in PERIODS:
+        rows = rows.annotate(period=PERIODS[grouping]('dataset__uploaded_at'))
+        group_fields = ['period']
+    grouped = (
+        rows.values(*group_fields, 'equipment_type')
+        .annotate(**sums)
+        .order_by(*group_fields, 'equipment_type')
+    )
+    return [summarize(row) for row in grouped]
@@ -0,0 +1,175 @@
+"""Outlier detection run on every upload, per equipment type and reading.
+
+Each reading is compared with its type's distribution in NumPy
+operations over one record batch at a time: a z-score against the type's
+mean and standard deviation, and Tukey's fences around the type's
+interquartile range. The mean and standard deviation come from the
+upload itself, or, with BASELINE_UPLOADS set, are pooled from the
+TypeStatistics of that many previous uploads so a uniformly drifted
+upload is still caught. Quartiles always come from the upload itself,
+as computed by compute_statistics.
+
+Only flagged readings are stored, as AnomalousReading rows, so finding
+the few bad readings in millions is an indexed query.
+"""
+import heapq
+import math
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from django.conf import settings
+
+from .models import AnomalousReading, EquipmentDataset, TypeStatistics
+from .storage import NUMERIC_COLUMNS, iter_batches
+
+
+DEFAULT_ANOMALY_DETECTION = {
+    'METHOD': 'both',
+    'Z_THRESHOLD': 3.0,
+    'IQR_FACTOR': 1.5,
+    'BASELINE_UPLOADS': 0,
+    'MAX_PER_DATASET': 10000,
+}
+
+METHODS = {'zscore', 'iqr', 'either', 'both'}
+
+
+def anomaly_settings():
+    options = {**DEFAULT_ANOMALY_DETECTION, **getattr(settings, 'ANOMALY_DETECTION', {})}
+    if options['METHOD'] not in METHODS:
+        raise ValueError(f"ANOMALY_DETECTION['METHOD'] must be one of: {', '.join(sorted(METHODS))}")
+    return options
+
+
+def baseline_statistics(uploads):
+    """Per-type mean and std of each reading, pooled over the last `uploads` datasets"""
+    dataset_ids = list(EquipmentDataset.objects.order_by('-uploaded_at').values_list('id', flat=True)[:uploads])
+    pooled = {}
+    for stats in TypeStatistics.objects.filter(dataset_id__in=dataset_ids):
+        pooled.setdefault(stats.equipment_type, []).append(stats)
+
+    baseline = {}
+    for eq_type, rows in pooled.items():
+        baseline[eq_type] = {}
+        for column in NUMERIC_COLUMNS:
+            metric = column.lower()
+            parts = [(row.count, getattr(row, f'mean_{metric}'), getattr(row, f'std_{metric}'))
+                     for row in rows if getattr(row, f'mean_{metric}') is not None]
+            total = sum(count for count, _, _ in parts)
+            if total < 2:
+                continue
+            mean = sum(count * part_mean for count, part_mean, _ in parts) / total
+            # Within-upload plus between-upload sums of squares
+            squares = sum((count - 1) * (std or 0.0) ** 2 + count * (part_mean - mean) ** 2
+                          for count, part_mean, std in parts)
+            baseline[eq_type][f'mean_{metric}'] = mean
+            baseline[eq_type][f'std_{metric}'] = math.sqrt(squares / (total - 1))
+    return baseline
+
+
+def reference_array(types, values):
+    return np.array([np.nan if values.get(eq_type) is None else values[eq_type] for eq_type in types])
+
+
+def detect_anomalies(file_path, type_statistics, quartiles, baseline=None):
+    """Return flagged readings of a stored dataset as dicts, highest |z| first.
+
+    type_statistics and quartiles are the 'types' and 'quartiles' parts
+    of compute_statistics for the same file; baseline, if given,
+    overrides their means and stds per type. The file is screened one
+    record batch at a time, and only the MAX_PER_DATASET highest-scoring
+    readings are kept, in a heap.
+    """
+    options = anomaly_settings()
+    types = sorted(type_statistics)
+    if not types:
+        return []
+    type_set = pa.array(types, pa.string())
+
+    # Per-type references, indexed by the type's position in types
+    reference = {eq_type: {**type_statistics[eq_type], **(baseline or {}).get(eq_type, {})} for eq_type in types}
+    references = {}
+    for column in NUMERIC_COLUMNS:
+        metric = column.lower()
+        references[column] = (
+            reference_array(types, {t: values.get(f'mean_{metric}') for t, values in reference.items()}),
+            reference_array(types, {t: values.get(f'std_{metric}') for t, values in reference.items()}),
+            reference_array(types, {t: quartiles[t][column][0] for t in types}),
+            reference_array(types, {t: quartiles[t][column][1] for t in types}),
+        )
+
+    # Min-heap of (score, -column position, -row, anomaly): its root is the first to drop out
+    heap = []
+    first_row = 0
+    for batch in iter_batches(file_path, columns=['Equipment Name', 'Type'] + NUMERIC_COLUMNS):
+        positions = pc.fill_null(pc.index_in(batch.column('Type'), value_set=type_set), -1).to_numpy()
+        known = positions >= 0
+        positions = np.where(known, positions, 0)
+
+        for column_position, column in enumerate(NUMERIC_COLUMNS):
+            type_means, type_stds, type_q1, type_q3 = references[column]
+            means, stds = type_means[positions], type_stds[positions]
+            q1, q3 = type_q1[positions], type_q3[positions]
+
+            values = batch.column(column).to_numpy(zero_copy_only=False)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                zscores = np.where(stds > 0, (values - means) / stds, np.nan)
+                by_zscore = np.abs(zscores) > options['Z_THRESHOLD']
+                fence = options['IQR_FACTOR'] * (q3 - q1)
+                by_iqr = (values < q1 - fence) | (values > q3 + fence)
+
+            if options['METHOD'] == 'zscore':
+                flagged = by_zscore
+            elif options['METHOD'] == 'iqr':
+                flagged = by_iqr
+            elif options['METHOD'] == 'either':
+                flagged = by_zscore | by_iqr
+            else:
+                flagged = by_zscore & by_iqr
+            rows = np.nonzero(flagged & known)[0]
+            scores = np.nan_to_num(np.abs(zscores[rows]), nan=0.0)
+            if len(heap) >= options['MAX_PER_DATASET']:
+                # Only readings that can displace a kept one are built
+                rows, scores = rows[scores >= heap[0][0]], scores[scores >= heap[0][0]]
+            if not len(rows):
+                continue
+
+            names = batch.column('Equipment Name').take(pa.array(rows)).to_pylist()
+            row_types = batch.column('Type').take(pa.array(rows)).to_pylist()
+            for row, name, eq_type, value, zscore, score, mean, z_hit, iqr_hit in zip(
+                rows.tolist(), names, row_types, values[rows].tolist(), zscores[rows].tolist(), scores.tolist(),
+                means[rows].tolist(), by_zscore[rows].tolist(), by_iqr[rows].tolist()
+            ):
+                anomaly = {
+                    'row_index': first_row + row,
+                    'equipment_name': name or '',
+                    'equipment_type': eq_type,
+                    'metric': column.lower(),
+                    'value': value,
+                    'expected': None if math.isnan(mean) else mean,
+                    'zscore': None if math.isnan(zscore) else zscore,
+                    'score': score,
+                    'method': 'both' if z_hit and iqr_hit else ('zscore' if z_hit else 'iqr'),
+                }
+                entry = (score, -column_position, -(first_row + row), anomaly)
+                if len(heap) < options['MAX_PER_DATASET']:
+                    heapq.heappush(heap, entry)
+                elif entry[:3] > heap[0][:3]:
+                    heapq.heapreplace(heap, entry)
+        first_row += batch.num_rows
+
+    # Highest score first; ties in column order, then file order
+    return [anomaly for *_, anomaly in sorted(heap, key=lambda entry: entry[:3], reverse=True)]
+
+
+def find_anomalies(file_path, statistics):
+    """detect_anomalies for the output of compute_statistics, with the baseline configured in ANOMALY_DETECTION"""
+    uploads = anomaly_settings()['BASELINE_UPLOADS']
+    baseline = baseline_statistics(uploads) if uploads else None
+    return detect_anomalies(file_path, statistics['types'], statistics['quartiles'], baseline)
+
+
+def save_anomalies(dataset, anomalies):
+    AnomalousReading.objects.bulk_create([
+        AnomalousReading(dataset=dataset, **anomaly) for anomaly in anomalies
+    ])
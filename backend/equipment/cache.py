@@ -0,0 +1,88 @@
+"""Response cache and conditional-request helpers for the read endpoints.
+
+Cache keys embed a data version: the time of the last committed change
+to any dataset, bumped by signals in signals.py. Entries therefore go
+stale exactly when an upload or retention change commits, with no key
+scanning. The same version drives the ETag and Last-Modified headers, so
+polling clients get 304s until something changes. Last-Modified is only
+sent once the second it names is over, because a later change within that
+second would otherwise validate against it.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+DATA_VERSION_KEY = 'equipment:data-version'
+
+
+def data_version():
+    """Nanosecond timestamp of the last data change (initialised on first use)"""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    cache.set(DATA_VERSION_KEY, time.time_ns(), None)
+
+
+def etag_matches(request, etag):
+    """Whether If-None-Match names etag"""
+    # GZipMiddleware weakens the ETag of compressed responses; compare weakly
+    etags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    return '*' in etags or etag in etags
+
+
+def is_settled(last_modified):
+    """Whether the second of last_modified is over.
+
+    HTTP dates have one-second resolution, so until then a further change
+    would carry the same Last-Modified and look unmodified.
+    """
+    return last_modified < int(time.time())
+
+
+def is_not_modified(request, etag, last_modified):
+    if request.headers.get('If-None-Match'):
+        return etag_matches(request, etag)
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since and is_settled(last_modified)
+
+
+def cached_response(request, namespace, key, build):
+    """Serve build() through the cache with ETag/Last-Modified validation.
+
+    build is called on a miss and must return a Response; only 200s are
+    cached. Entries are per user, per key and per data version.
+    """
+    version = data_version()
+    cache_key = f'equipment:{namespace}:{request.user.pk}:{key}:{version}'
+    etag = quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+    last_modified = version // 1_000_000_000
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if is_settled(last_modified):
+        headers['Last-Modified'] = http_date(last_modified)
+    
+    if is_not_modified(request, etag, last_modified):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    data = cache.get(cache_key)
+    if data is None:
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        data = response.data
+        cache.set(cache_key, data)
+    return Response(data, headers=headers)
+
+
+def dataset_rows_etag(dataset, params):
+    """ETag of a page of stored rows: a dataset's rows never change, so its content and the query identify it"""
+    key = f'{dataset.id}:{dataset.content_hash}:{params.urlencode()}'
+    return quote_etag(hashlib.md5(key.encode()).hexdigest())
@@ -0,0 +1,165 @@
+"""Chart images for PDF reports.
+
+Chart inputs are reduced from the memory-mapped dataset columns first:
+histogram bin counts, per-type quartiles for box plots, and either the
+raw points or a 2D histogram for the Pressure/Temperature scatter. Only
+those small payloads are sent to a process pool, where matplotlib
+rasterizes them to PNG, so rendering never holds the GIL of a web worker
+and millions of rows never cross a process boundary.
+"""
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pyarrow.compute as pc
+
+from .storage import NUMERIC_COLUMNS, open_table
+
+
+HISTOGRAM_BINS = 40
+# Above this many rows the scatter plot is drawn as a 2D histogram instead
+SCATTER_MAX_POINTS = 20000
+SCATTER_BINS = 120
+FIGURE_SIZE = (7, 3.2)
+DPI = 110
+
+_pool = None
+
+
+def get_pool(processes):
+    global _pool
+    if _pool is None:
+        # spawn rather than fork: the parent has DB connections and worker threads
+        _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def discard_pool(pool):
+    """Drop a broken pool so the next get_pool starts a new one"""
+    global _pool
+    # Another thread may already have replaced it
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def column_values(table, column):
+    """A column as a float64 NumPy array with nulls dropped"""
+    return pc.drop_null(table[column]).to_numpy()
+
+
+def histogram_payload(table):
+    histograms = {}
+    for column in NUMERIC_COLUMNS:
+        values = column_values(table, column)
+        if len(values):
+            counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+            histograms[column] = (counts, edges)
+    return {'kind': 'histograms', 'histograms': histograms}
+
+
+def boxplot_payload(table, column):
+    """Per-type box statistics from approximate (t-digest) quartiles, without fliers"""
+    grouped = table.group_by('Type').aggregate([
+        (column, 'tdigest', pc.TDigestOptions(q=[0.25, 0.5, 0.75])),
+        (column, 'min_max'),
+    ])
+    boxes = []
+    for row in sorted(grouped.to_pylist(), key=lambda row: str(row['Type'])):
+        quartiles = row[f'{column}_tdigest']
+        if row['Type'] is None or not quartiles or any(value is None for value in quartiles):
+            continue
+        q1, median, q3 = quartiles
+        low, high = row[f'{column}_min_max']['min'], row[f'{column}_min_max']['max']
+        spread = 1.5 * (q3 - q1)
+        boxes.append({
+            'label': row['Type'],
+            'q1': q1,
+            'med': median,
+            'q3': q3,
+            'whislo': max(low, q1 - spread),
+            'whishi': min(high, q3 + spread),
+            'fliers': [],
+        })
+    return {'kind': 'boxplot', 'column': column, 'boxes': boxes}
+
+
+def scatter_payload(table):
+    valid = table.filter(pc.and_(pc.is_valid(table['Pressure']), pc.is_valid(table['Temperature'])))
+    pressure = valid['Pressure'].to_numpy()
+    temperature = valid['Temperature'].to_numpy()
+    if len(pressure) <= SCATTER_MAX_POINTS:
+        return {'kind': 'scatter', 'x': pressure, 'y': temperature}
+    counts, x_edges, y_edges = np.histogram2d(pressure, temperature, bins=SCATTER_BINS)
+    return {'kind': 'density', 'counts': counts, 'x_edges': x_edges, 'y_edges': y_edges, 'points': len(pressure)}
+
+
+def chart_payloads(file_path):
+    """Reduce a stored dataset to the small inputs of every report chart"""
+    table = open_table(file_path, columns=['Type'] + NUMERIC_COLUMNS)
+    payloads = [histogram_payload(table)]
+    payloads.extend(boxplot_payload(table, column) for column in NUMERIC_COLUMNS)
+    payloads.append(scatter_payload(table))
+    return payloads
+
+
+def render_chart(payload):
+    """Rasterize one chart payload to PNG bytes; runs in a pool process"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+
+    kind = payload['kind']
+    if kind == 'histograms':
+        histograms = payload['histograms']
+        figure = Figure(figsize=FIGURE_SIZE)
+        axes = figure.subplots(1, max(len(histograms), 1), squeeze=False)[0]
+        for ax, (column, (counts, edges)) in zip(axes, histograms.items()):
+            ax.stairs(counts, edges, fill=True, color='#0099cc')
+            ax.set_title(column, fontsize=9)
+            ax.tick_params(labelsize=7)
+    elif kind == 'boxplot':
+        figure = Figure(figsize=FIGURE_SIZE)
+        ax = figure.subplots()
+        if payload['boxes']:
+            ax.bxp(payload['boxes'], showfliers=False)
+        ax.set_title(f"{payload['column']} by Equipment Type", fontsize=9)
+        ax.tick_params(labelsize=7)
+        ax.tick_params(axis='x', labelrotation=30)
+    else:
+        figure = Figure(figsize=FIGURE_SIZE)
+        ax = figure.subplots()
+        if kind == 'scatter':
+            ax.scatter(payload['x'], payload['y'], s=6, alpha=0.6, color='#0099cc')
+            ax.set_title('Pressure vs Temperature', fontsize=9)
+        else:
+            mesh = ax.pcolormesh(payload['x_edges'], payload['y_edges'], payload['counts'].T,
+                                 cmap='viridis', norm=matplotlib.colors.LogNorm())
+            figure.colorbar(mesh, ax=ax, label='Readings')
+            ax.set_title(f"Pressure vs Temperature ({payload['points']:,} readings, binned)", fontsize=9)
+        ax.set_xlabel('Pressure', fontsize=8)
+        ax.set_ylabel('Temperature', fontsize=8)
+        ax.tick_params(labelsize=7)
+
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=DPI)
+    return buffer.getvalue()
+
+
+def render_charts(file_path, processes):
+    """PNG bytes of every report chart for a stored dataset, rendered in the process pool.
+
+    A pool whose child died (e.g. OOM-killed) is unusable for good, so it
+    is replaced and the charts are rendered once more on the new one.
+    """
+    payloads = chart_payloads(file_path)
+    for attempt in range(2):
+        pool = get_pool(processes)
+        try:
+            return list(pool.map(render_chart, payloads))
+        except BrokenProcessPool:
+            discard_pool(pool)
+            if attempt:
+                raise
@@ -0,0 +1,186 @@
+"""Dataset comparison and trends across upload history.
+
+Comparisons join two stored datasets on Equipment Name with a single
+vectorized full outer join over the memory-mapped columns and return
+only the differences: added and removed equipment, readings that
+changed, and per-type deltas taken from the precomputed TypeStatistics.
+Trends are built entirely from statistics in the database, so no
+dataset file is read for them.
+"""
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .storage import NUMERIC_COLUMNS, open_table
+
+
+KEY_COLUMN = 'Equipment Name'
+COMPARED_COLUMNS = ['Type'] + NUMERIC_COLUMNS
+TYPE_STAT_FIELDS = ['count'] + [f'mean_{column.lower()}' for column in NUMERIC_COLUMNS]
+# Rows listed per category when limit is not given
+DEFAULT_DIFF_LIMIT = 100
+
+
+def delta(base, other):
+    if base is None or other is None:
+        return None
+    return other - base
+
+
+def latest_readings(file_path):
+    """One row per equipment name, keeping the last reading of names that repeat"""
+    table = open_table(file_path, columns=[KEY_COLUMN] + COMPARED_COLUMNS)
+    latest = table.group_by(KEY_COLUMN, use_threads=False).aggregate(
+        [(column, 'last') for column in COMPARED_COLUMNS]
+    )
+    latest = latest.rename_columns([KEY_COLUMN] + COMPARED_COLUMNS)
+    return latest.append_column('present', pa.repeat(True, latest.num_rows)).filter(
+        pc.is_valid(latest[KEY_COLUMN])
+    )
+
+
+def changed_mask(joined, tolerance):
+    """Rows present in both datasets whose type or any reading differs"""
+    mask = pc.not_equal(joined['Type (base)'], joined['Type (other)'])
+    mask = pc.fill_null(mask, False)
+    for column in NUMERIC_COLUMNS:
+        base, other = joined[f'{column} (base)'], joined[f'{column} (other)']
+        differs = pc.fill_null(pc.greater(pc.abs(pc.subtract(other, base)), tolerance), False)
+        # A reading that appears or disappears also counts as a change
+        differs = pc.or_(differs, pc.xor(pc.is_null(base), pc.is_null(other)))
+        mask = pc.or_(mask, differs)
+    return mask
+
+
+def reading_changed(before, after, tolerance):
+    """Per-value counterpart of the reading test in changed_mask"""
+    if before is None or after is None:
+        return (before is None) != (after is None)
+    return abs(after - before) > tolerance
+
+
+def readings(row, suffix):
+    return {column: row[f'{column} ({suffix})'] for column in COMPARED_COLUMNS}
+
+
+def diff_rows(file_path, other_file_path, limit=DEFAULT_DIFF_LIMIT, tolerance=0.0):
+    """Per-equipment differences between two stored datasets.
+
+    Returns counts of added, removed, changed and unchanged equipment and
+    up to limit rows of each category, ordered by equipment name. Changed
+    rows only carry the columns that changed by more than tolerance.
+    """
+    base = latest_readings(file_path)
+    other = latest_readings(other_file_path)
+    joined = base.join(other, KEY_COLUMN, join_type='full outer',
+                       left_suffix=' (base)', right_suffix=' (other)')
+    joined = joined.take(pc.sort_indices(joined, sort_keys=[(KEY_COLUMN, 'ascending')]))
+
+    in_base = pc.is_valid(joined['present (base)'])
+    in_other = pc.is_valid(joined['present (other)'])
+    added = joined.filter(pc.and_not(in_other, in_base))
+    removed = joined.filter(pc.and_not(in_base, in_other))
+    common = joined.filter(pc.and_(in_base, in_other))
+    changed = common.filter(changed_mask(common, tolerance))
+
+    changed_rows = []
+    for row in changed.slice(0, limit).to_pylist():
+        entry = {KEY_COLUMN: row[KEY_COLUMN]}
+        if row['Type (base)'] != row['Type (other)']:
+            entry['Type'] = {'base': row['Type (base)'], 'other': row['Type (other)']}
+        else:
+            entry['Type'] = row['Type (base)']
+        for column in NUMERIC_COLUMNS:
+            before, after = row[f'{column} (base)'], row[f'{column} (other)']
+            if reading_changed(before, after, tolerance):
+                entry[column] = {'base': before, 'other': after, 'delta': delta(before, after)}
+        changed_rows.append(entry)
+
+    return {
+        'counts': {
+            'base': base.num_rows,
+            'other': other.num_rows,
+            'added': added.num_rows,
+            'removed': removed.num_rows,
+            'changed': changed.num_rows,
+            'unchanged': common.num_rows - changed.num_rows,
+        },
+        'added': [{KEY_COLUMN: row[KEY_COLUMN], **readings(row, 'other')}
+                  for row in added.slice(0, limit).to_pylist()],
+        'removed': [{KEY_COLUMN: row[KEY_COLUMN], **readings(row, 'base')}
+                    for row in removed.slice(0, limit).to_pylist()],
+        'changed': changed_rows,
+    }
+
+
+def type_values(dataset):
+    return {
+        stats.equipment_type: {field: getattr(stats, field) for field in TYPE_STAT_FIELDS}
+        for stats in dataset.type_statistics.all()
+    }
+
+
+def type_deltas(base, other):
+    """Per-type count and mean changes between two datasets, from their TypeStatistics"""
+    base_types, other_types = type_values(base), type_values(other)
+    deltas = {}
+    for eq_type in sorted(base_types.keys() | other_types.keys()):
+        before = base_types.get(eq_type, {})
+        after = other_types.get(eq_type, {})
+        deltas[eq_type] = {
+            field: {
+                'base': before.get(field),
+                'other': after.get(field),
+                'delta': delta(before.get(field, 0 if field == 'count' else None),
+                               after.get(field, 0 if field == 'count' else None)),
+            }
+            for field in TYPE_STAT_FIELDS
+        }
+    return deltas
+
+
+def compare_datasets(base, other, limit=DEFAULT_DIFF_LIMIT, tolerance=0.0):
+    """Compact diff of two EquipmentDataset instances"""
+    return {
+        'base': base.id,
+        'other': other.id,
+        'totals': {
+            field: {'base': getattr(base, field), 'other': getattr(other, field),
+                    'delta': delta(getattr(base, field), getattr(other, field))}
+            for field in ('total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature')
+        },
+        'types': type_deltas(base, other),
+        'equipment': diff_rows(base.file_path, other.file_path, limit=limit, tolerance=tolerance),
+    }
+
+
+def dataset_trends(datasets):
+    """Totals and per-type statistics of datasets (oldest first), each with deltas from the previous one"""
+    points = []
+    previous = None
+    for dataset in datasets:
+        point = {
+            'id': dataset.id,
+            'name': dataset.name,
+            'uploaded_at': dataset.uploaded_at,
+            'total_count': dataset.total_count,
+            'avg_flowrate': dataset.avg_flowrate,
+            'avg_pressure': dataset.avg_pressure,
+            'avg_temperature': dataset.avg_temperature,
+            'types': type_values(dataset),
+        }
+        if previous:
+            point['deltas'] = {
+                field: delta(previous[field], point[field])
+                for field in ('total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature')
+            }
+            point['type_deltas'] = {
+                eq_type: {
+                    field: delta(previous['types'].get(eq_type, {}).get(field, 0 if field == 'count' else None),
+                                 values[field])
+                    for field in TYPE_STAT_FIELDS
+                }
+                for eq_type, values in point['types'].items()
+            }
+        points.append(point)
+        previous = point
+    return points
@@ -0,0 +1,81 @@
+"""Streaming CSV ingestion for uploaded equipment datasets"""
+import os
+from collections import defaultdict
+import pandas as pd
+
+from .storage import REQUIRED_COLUMNS, NUMERIC_COLUMNS, DatasetWriter
+
+# Rows parsed per chunk; bounds peak memory independently of the file size
+CHUNK_SIZE = 50000
+
+
+class RunningAggregates:
+    """Statistics accumulated chunk by chunk while a CSV is parsed"""
+
+    def __init__(self):
+        self.total_count = 0
+        self.sums = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+        self.counts = dict.fromkeys(NUMERIC_COLUMNS, 0)
+        self.type_counts = pd.Series(dtype='int64')
+
+    def update(self, chunk):
+        self.total_count += len(chunk)
+        for column in NUMERIC_COLUMNS:
+            values = chunk[column]
+            self.sums[column] += float(values.sum())
+            self.counts[column] += int(values.count())
+        self.type_counts = self.type_counts.add(chunk['Type'].value_counts(), fill_value=0)
+
+    def mean(self, column):
+        if not self.counts[column]:
+            return None
+        return self.sums[column] / self.counts[column]
+
+    def type_distribution(self):
+        counts = self.type_counts.sort_values(ascending=False, kind='stable')
+        return {eq_type: int(count) for eq_type, count in counts.items()}
+
+
+def validate_columns(columns):
+    """Raise ValueError when any of the required columns is missing"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        raise ValueError(f'Missing required columns: {", ".join(missing_columns)}')
+
+
+def column_dtypes():
+    """Parse dtypes: float64 for the numeric readings, str for every other column"""
+    return defaultdict(lambda: str, {column: 'float64' for column in NUMERIC_COLUMNS})
+
+
+def ingest_csv(source, file_path, chunksize=CHUNK_SIZE, progress=None):
+    """Parse a CSV upload in chunks, appending each one to the Arrow file at file_path.
+
+    Only one chunk of rows is held in memory at a time. If progress is
+    given it is called with source.tell() after each chunk. Returns the
+    RunningAggregates for the file; on failure (including a file with
+    no data rows) the partially written file is removed and the
+    exception re-raised.
+    """
+    aggregates = RunningAggregates()
+    try:
+        with DatasetWriter(file_path) as writer:
+            chunks = pd.read_csv(
+                source,
+                chunksize=chunksize,
+                dtype=column_dtypes(),
+            )
+            for index, chunk in enumerate(chunks):
+                if index == 0:
+                    validate_columns(chunk.columns)
+                aggregates.update(chunk)
+                writer.write(chunk)
+                if progress:
+                    progress(source.tell())
+        if not aggregates.total_count:
+            raise ValueError('No data rows found in CSV')
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    return aggregates
@@ -0,0 +1,167 @@
+"""Background ingestion: uploads are staged on disk and parsed by a local worker pool.
+
+Jobs are rows in the database, so their state survives restarts. Each
+web process runs a small thread pool that picks jobs up as soon as the
+request that created them commits. Jobs still "running" after
+INGEST_JOB_TIMEOUT seconds are taken to have lost their worker: each web
+process requeues them and resumes queued jobs when it serves its first
+request, and the process_ingestion_jobs management command does the same.
+"""
+import hashlib
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import IngestionJob
+from .pipeline import DuplicateUpload, create_dataset, find_duplicate
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.INGEST_WORKERS, thread_name_prefix='ingest')
+    return _executor
+
+
+def log_failure(future):
+    """Done callback logging an exception that would otherwise stay unread on the future"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error('Background task failed', exc_info=future.exception())
+
+
+def submit(fn, *args):
+    """Run fn(*args) on the background pool; exceptions it raises are logged"""
+    future = get_executor().submit(fn, *args)
+    future.add_done_callback(log_failure)
+    return future
+
+
+def stage_upload(uploaded_file):
+    """Copy an uploaded file to MEDIA_ROOT/incoming in blocks, hashing it on the way.
+
+    Returns (staged path, SHA-256 hex digest).
+    """
+    incoming_dir = os.path.join(settings.MEDIA_ROOT, 'incoming')
+    os.makedirs(incoming_dir, exist_ok=True)
+    upload_path = os.path.join(incoming_dir, f'{uuid.uuid4().hex}.csv')
+    digest = hashlib.sha256()
+    with open(upload_path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            destination.write(chunk)
+    return upload_path, digest.hexdigest()
+
+
+def enqueue_upload(upload_path, name, user=None, content_hash=''):
+    """Create a queued job for a staged upload and start it once the transaction commits.
+
+    If an identical file was already ingested the staged copy is dropped
+    and the job is created already succeeded, pointing at that dataset.
+    """
+    size = os.path.getsize(upload_path)
+    duplicate = find_duplicate(content_hash)
+    if duplicate:
+        os.remove(upload_path)
+        now = timezone.now()
+        return IngestionJob.objects.create(
+            name=name,
+            size=size,
+            content_hash=content_hash,
+            status=IngestionJob.STATUS_SUCCEEDED,
+            progress=1.0,
+            dataset=duplicate,
+            duplicate=True,
+            created_by=user,
+            started_at=now,
+            finished_at=now,
+        )
+    
+    job = IngestionJob.objects.create(
+        name=name,
+        upload_path=upload_path,
+        size=size,
+        content_hash=content_hash,
+        created_by=user,
+    )
+    transaction.on_commit(lambda: submit(run_job, job.id))
+    return job
+
+
+def run_job(job_id):
+    """Claim a queued job and ingest its staged file; safe to call for any job id"""
+    close_old_connections()
+    try:
+        claimed = IngestionJob.objects.filter(id=job_id, status=IngestionJob.STATUS_QUEUED).update(
+            status=IngestionJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if not claimed:
+            return
+        job = IngestionJob.objects.get(id=job_id)
+        
+        def report_progress(bytes_read):
+            progress = min(bytes_read / job.size, 1.0) if job.size else 0
+            IngestionJob.objects.filter(id=job_id).update(progress=progress)
+        
+        try:
+            # An identical upload may have been ingested while this job was queued
+            dataset = find_duplicate(job.content_hash)
+            duplicate = dataset is not None
+            if not duplicate:
+                try:
+                    with open(job.upload_path, 'rb') as source:
+                        dataset, _ = create_dataset(source, job.name, progress=report_progress,
+                                                    content_hash=job.content_hash)
+                except DuplicateUpload as e:
+                    dataset, duplicate = e.dataset, True
+        except Exception as e:
+            logger.warning('Ingestion job %s failed: %s', job_id, e)
+            IngestionJob.objects.filter(id=job_id).update(
+                status=IngestionJob.STATUS_FAILED, error=str(e), finished_at=timezone.now()
+            )
+        else:
+            IngestionJob.objects.filter(id=job_id).update(
+                status=IngestionJob.STATUS_SUCCEEDED, progress=1.0, dataset=dataset,
+                duplicate=duplicate, finished_at=timezone.now()
+            )
+        finally:
+            if os.path.exists(job.upload_path):
+                os.remove(job.upload_path)
+    finally:
+        close_old_connections()
+
+
+def requeue_stale_jobs(timeout=None):
+    """Put jobs running for longer than timeout seconds (INGEST_JOB_TIMEOUT by default) back in the queue.
+
+    Returns how many were requeued.
+    """
+    if timeout is None:
+        timeout = settings.INGEST_JOB_TIMEOUT
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return IngestionJob.objects.filter(status=IngestionJob.STATUS_RUNNING, started_at__lt=cutoff).update(
+        status=IngestionJob.STATUS_QUEUED, progress=0
+    )
+
+
+def queued_job_ids():
+    return list(
+        IngestionJob.objects.filter(status=IngestionJob.STATUS_QUEUED)
+        .order_by('created_at').values_list('id', flat=True)
+    )
+
+
+def resume_jobs():
+    """Requeue stale jobs and hand every queued job to the background pool"""
+    requeue_stale_jobs()
+    for job_id in queued_job_ids():
+        submit(run_job, job_id)
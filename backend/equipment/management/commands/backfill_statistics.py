@@ -0,0 +1,33 @@
+import os
+from django.core.management.base import BaseCommand
+from equipment.cache import bump_data_version
+from equipment.models import EquipmentDataset
+from equipment.retention import local_file_path
+from equipment.stats import backfill_statistics, datasets_missing_statistics
+
+
+class Command(BaseCommand):
+    help = 'Compute the statistics and per-type aggregates of datasets uploaded before they were recorded'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every dataset, not only those missing statistics',
+        )
+
+    def handle(self, *args, **options):
+        datasets = EquipmentDataset.objects.all() if options['all'] else datasets_missing_statistics()
+        filled = 0
+        for dataset in datasets.order_by('uploaded_at').iterator():
+            # Archived datasets are restored; the sweep drops the copy after REHYDRATED_HOURS
+            file_path = local_file_path(dataset)
+            if not os.path.exists(file_path):
+                self.stderr.write(f'{dataset.id} {dataset.name}: file not found, skipped')
+                continue
+            backfill_statistics(dataset, file_path)
+            filled += 1
+            self.stdout.write(f'{dataset.id} {dataset.name}: done')
+        if filled:
+            # Statistics are bulk-written, which sends no signals
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {filled} dataset(s)'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from equipment.jobs import queued_job_ids, requeue_stale_jobs, run_job
+from equipment.models import IngestionJob
+
+
+class Command(BaseCommand):
+    help = 'Run queued ingestion jobs, e.g. ones left behind by a server restart'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requeue-running', action='store_true',
+            help='Also retry every job in "running", not only those past INGEST_JOB_TIMEOUT',
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(timeout=0 if options['requeue_running'] else None)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s)')
+        job_ids = queued_job_ids()
+        for job_id in job_ids:
+            run_job(job_id)
+            job = IngestionJob.objects.get(id=job_id)
+            self.stdout.write(f'{job.id} {job.name}: {job.status}')
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(job_ids)} job(s)'))
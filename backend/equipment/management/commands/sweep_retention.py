@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from equipment.retention import sweep_retention
+
+
+class Command(BaseCommand):
+    help = 'Archive and delete datasets and expire upload sessions according to the DATASET_RETENTION policy'
+
+    def handle(self, *args, **options):
+        result = sweep_retention()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']}, archived {result['archived']}, "
+            f"dropped {result['rehydrated_dropped']} restored copies, "
+            f"pruned {result['readings_pruned']} readings, "
+            f"expired {result['sessions_expired']} upload sessions"
+        ))
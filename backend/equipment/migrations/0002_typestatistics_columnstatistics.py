@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TypeStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("equipment_type", models.CharField(max_length=100)),
+                ("count", models.IntegerField(default=0)),
+                ("mean_flowrate", models.FloatField(blank=True, null=True)),
+                ("mean_pressure", models.FloatField(blank=True, null=True)),
+                ("mean_temperature", models.FloatField(blank=True, null=True)),
+                ("std_flowrate", models.FloatField(blank=True, null=True)),
+                ("std_pressure", models.FloatField(blank=True, null=True)),
+                ("std_temperature", models.FloatField(blank=True, null=True)),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="type_statistics",
+                        to="equipment.equipmentdataset",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ColumnStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("column", models.CharField(max_length=100)),
+                ("count", models.IntegerField(default=0)),
+                ("min_value", models.FloatField(blank=True, null=True)),
+                ("max_value", models.FloatField(blank=True, null=True)),
+                ("mean", models.FloatField(blank=True, null=True)),
+                ("std", models.FloatField(blank=True, null=True)),
+                ("p50", models.FloatField(blank=True, null=True)),
+                ("p95", models.FloatField(blank=True, null=True)),
+                ("p99", models.FloatField(blank=True, null=True)),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="column_statistics",
+                        to="equipment.equipmentdataset",
+                    ),
+                ),
+            ],
+        ),
+    ]
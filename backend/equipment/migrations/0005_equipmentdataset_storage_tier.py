@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:25
+
+import os
+
+from django.db import migrations, models
+
+
+def record_file_sizes(apps, schema_editor):
+    EquipmentDataset = apps.get_model("equipment", "EquipmentDataset")
+    for dataset in EquipmentDataset.objects.only("id", "file_path"):
+        if os.path.exists(dataset.file_path):
+            EquipmentDataset.objects.filter(id=dataset.id).update(
+                file_size=os.path.getsize(dataset.file_path)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0004_uploadsession_uploadchunk"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="equipmentdataset",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmentdataset",
+            name="file_size",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentdataset",
+            name="storage_tier",
+            field=models.CharField(
+                choices=[("hot", "Hot"), ("archived", "Archived")],
+                default="hot",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(record_file_sizes, migrations.RunPython.noop),
+    ]
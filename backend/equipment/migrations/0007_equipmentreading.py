@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0006_equipmentdataset_content_hash_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EquipmentReading",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("equipment_name", models.CharField(max_length=255)),
+                ("equipment_type", models.CharField(blank=True, max_length=100)),
+                ("recorded_at", models.DateTimeField()),
+                ("flowrate", models.FloatField(blank=True, null=True)),
+                ("pressure", models.FloatField(blank=True, null=True)),
+                ("temperature", models.FloatField(blank=True, null=True)),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="readings",
+                        to="equipment.equipmentdataset",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["equipment_name", "recorded_at"],
+                        name="reading_equipment_time_idx",
+                    )
+                ],
+            },
+        ),
+    ]
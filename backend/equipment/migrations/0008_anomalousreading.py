@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0007_equipmentreading"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnomalousReading",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row_index", models.IntegerField()),
+                ("equipment_name", models.CharField(max_length=255)),
+                ("equipment_type", models.CharField(max_length=100)),
+                ("metric", models.CharField(max_length=20)),
+                ("value", models.FloatField()),
+                ("expected", models.FloatField(blank=True, null=True)),
+                ("zscore", models.FloatField(blank=True, null=True)),
+                ("score", models.FloatField(default=0)),
+                (
+                    "method",
+                    models.CharField(
+                        choices=[
+                            ("zscore", "Z-score"),
+                            ("iqr", "Interquartile range"),
+                            ("both", "Z-score and interquartile range"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to="equipment.equipmentdataset",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-score"],
+                "indexes": [
+                    models.Index(
+                        fields=["dataset", "-score"], name="anomaly_dataset_score_idx"
+                    ),
+                    models.Index(
+                        fields=["equipment_name"], name="anomaly_equipment_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0008_anomalousreading"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="flowrate_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="flowrate_max",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="flowrate_min",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="flowrate_sum",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="flowrate_sumsq",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="pressure_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="pressure_max",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="pressure_min",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="pressure_sum",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="pressure_sumsq",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="temperature_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="temperature_max",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="temperature_min",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="temperature_sum",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmenttypedistribution",
+            name="temperature_sumsq",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="equipmenttypedistribution",
+            index=models.Index(
+                fields=["dataset", "equipment_type"],
+                name="distribution_dataset_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="equipmenttypedistribution",
+            index=models.Index(
+                fields=["equipment_type", "dataset"],
+                name="distribution_type_dataset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0009_equipmenttypedistribution_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equipmentdataset",
+            index=models.Index(fields=["-uploaded_at"], name="dataset_uploaded_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ingestionjob",
+            index=models.Index(
+                fields=["status", "created_at"], name="job_status_created_idx"
+            ),
+        ),
+    ]
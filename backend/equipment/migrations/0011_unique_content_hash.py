@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def clear_duplicate_hashes(apps, schema_editor):
+    """Keep the hash only on the newest dataset of each duplicate group, as find_duplicate did"""
+    EquipmentDataset = apps.get_model("equipment", "EquipmentDataset")
+    repeated = (
+        EquipmentDataset.objects.exclude(content_hash="")
+        .values("content_hash")
+        .annotate(copies=Count("id"))
+        .filter(copies__gt=1)
+        .values_list("content_hash", flat=True)
+    )
+    for content_hash in list(repeated):
+        newest = EquipmentDataset.objects.filter(content_hash=content_hash).latest("uploaded_at")
+        EquipmentDataset.objects.filter(content_hash=content_hash).exclude(id=newest.id).update(
+            content_hash=""
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0010_access_pattern_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="equipmentdataset",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("content_hash", ""), _negated=True),
+                fields=("content_hash",),
+                name="dataset_unique_content_hash",
+            ),
+        ),
+    ]
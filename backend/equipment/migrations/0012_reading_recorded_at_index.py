@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0011_unique_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equipmentreading",
+            index=models.Index(fields=["recorded_at"], name="reading_recorded_at_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0012_reading_recorded_at_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="equipmentdataset",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
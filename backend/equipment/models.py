@@ -1,12 +1,26 @@
+import uuid
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
 
 class EquipmentDataset(models.Model):
-    """Model to store uploaded datasets (keeping last 5)"""
+    """Model to store uploaded datasets, subject to the DATASET_RETENTION policy"""
+    TIER_HOT = 'hot'
+    TIER_ARCHIVED = 'archived'
+    TIER_CHOICES = [
+        (TIER_HOT, 'Hot'),
+        (TIER_ARCHIVED, 'Archived'),
+    ]
+    
     name = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(default=timezone.now)
     file_path = models.CharField(max_length=500)
+    file_size = models.BigIntegerField(default=0)
+    # SHA-256 of the uploaded CSV bytes, used to detect re-uploads; indexed by dataset_unique_content_hash
+    content_hash = models.CharField(max_length=64, blank=True)
+    storage_tier = models.CharField(max_length=20, choices=TIER_CHOICES, default=TIER_HOT)
+    archived_at = models.DateTimeField(null=True, blank=True)
     total_count = models.IntegerField(default=0)
     avg_flowrate = models.FloatField(null=True, blank=True)
     avg_pressure = models.FloatField(null=True, blank=True)
@@ -14,16 +28,217 @@ class EquipmentDataset(models.Model):
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Latest dataset, history, trends and retention all walk uploads newest first
+            models.Index(fields=['-uploaded_at'], name='dataset_uploaded_at_idx'),
+        ]
+        constraints = [
+            # Two concurrent uploads of one file cannot both be stored
+            models.UniqueConstraint(fields=['content_hash'], condition=~models.Q(content_hash=''),
+                                    name='dataset_unique_content_hash'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.uploaded_at.strftime('%Y-%m-%d %H:%M')}"
 
 
 class EquipmentTypeDistribution(models.Model):
-    """Model to store equipment type distribution for each dataset"""
+    """Model to store equipment type distribution and additive per-type aggregates for each dataset.
+
+    Counts, sums and sums of squares add up across datasets, so means and
+    standard deviations over any set of uploads are one GROUP BY away.
+    """
     dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='type_distributions')
     equipment_type = models.CharField(max_length=100)
     count = models.IntegerField(default=0)
+    flowrate_count = models.IntegerField(default=0)
+    flowrate_sum = models.FloatField(default=0)
+    flowrate_sumsq = models.FloatField(default=0)
+    flowrate_min = models.FloatField(null=True, blank=True)
+    flowrate_max = models.FloatField(null=True, blank=True)
+    pressure_count = models.IntegerField(default=0)
+    pressure_sum = models.FloatField(default=0)
+    pressure_sumsq = models.FloatField(default=0)
+    pressure_min = models.FloatField(null=True, blank=True)
+    pressure_max = models.FloatField(null=True, blank=True)
+    temperature_count = models.IntegerField(default=0)
+    temperature_sum = models.FloatField(default=0)
+    temperature_sumsq = models.FloatField(default=0)
+    temperature_min = models.FloatField(null=True, blank=True)
+    temperature_max = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['dataset', 'equipment_type'], name='distribution_dataset_type_idx'),
+            models.Index(fields=['equipment_type', 'dataset'], name='distribution_type_dataset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.dataset.name} - {self.equipment_type}: {self.count}"
+
+
+class ColumnStatistics(models.Model):
+    """Model to store descriptive statistics of a numeric column, computed at upload"""
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='column_statistics')
+    column = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    mean = models.FloatField(null=True, blank=True)
+    std = models.FloatField(null=True, blank=True)
+    p50 = models.FloatField(null=True, blank=True)
+    p95 = models.FloatField(null=True, blank=True)
+    p99 = models.FloatField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.dataset.name} - {self.column}"
+
+
+class TypeStatistics(models.Model):
+    """Model to store per equipment type averages of the numeric columns"""
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='type_statistics')
+    equipment_type = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    mean_flowrate = models.FloatField(null=True, blank=True)
+    mean_pressure = models.FloatField(null=True, blank=True)
+    mean_temperature = models.FloatField(null=True, blank=True)
+    std_flowrate = models.FloatField(null=True, blank=True)
+    std_pressure = models.FloatField(null=True, blank=True)
+    std_temperature = models.FloatField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.dataset.name} - {self.equipment_type}"
+
+
+class EquipmentReading(models.Model):
+    """Model to store one equipment's readings from an upload, as a point in its time series.
+
+    Readings outlive their dataset: deleting it only unlinks them. The
+    retention sweep deletes them once older than READINGS_DAYS.
+    """
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='readings')
+    equipment_name = models.CharField(max_length=255)
+    equipment_type = models.CharField(max_length=100, blank=True)
+    recorded_at = models.DateTimeField()
+    flowrate = models.FloatField(null=True, blank=True)
+    pressure = models.FloatField(null=True, blank=True)
+    temperature = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['equipment_name', 'recorded_at'], name='reading_equipment_time_idx'),
+            # Retention prunes readings by age
+            models.Index(fields=['recorded_at'], name='reading_recorded_at_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_name} @ {self.recorded_at:%Y-%m-%d %H:%M}"
+
+
+class AnomalousReading(models.Model):
+    """Model to store a reading flagged as an outlier for its equipment type at upload"""
+    METHOD_CHOICES = [
+        ('zscore', 'Z-score'),
+        ('iqr', 'Interquartile range'),
+        ('both', 'Z-score and interquartile range'),
+    ]
+    
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='anomalies')
+    row_index = models.IntegerField()
+    equipment_name = models.CharField(max_length=255)
+    equipment_type = models.CharField(max_length=100)
+    metric = models.CharField(max_length=20)
+    value = models.FloatField()
+    expected = models.FloatField(null=True, blank=True)
+    zscore = models.FloatField(null=True, blank=True)
+    # |zscore|, used to rank anomalies (0 when no z-score applies)
+    score = models.FloatField(default=0)
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES)
+    
+    class Meta:
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['dataset', '-score'], name='anomaly_dataset_score_idx'),
+            models.Index(fields=['equipment_name'], name='anomaly_equipment_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_name} {self.metric}={self.value}"
+
+
+class IngestionJob(models.Model):
+    """Model to track a CSV upload that is parsed in the background"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    upload_path = models.CharField(max_length=500)
+    size = models.BigIntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.FloatField(default=0)
+    error = models.TextField(blank=True)
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # True when the upload matched an existing dataset and was not parsed again
+    duplicate = models.BooleanField(default=False)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # process_ingestion_jobs scans queued jobs oldest first
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} - {self.status}"
+
+
+class UploadSession(models.Model):
+    """Model to track a resumable upload sent as separately checksummed chunks"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    job = models.ForeignKey(IngestionJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+    
+    def expected_chunk_size(self, index):
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
+    
+    def __str__(self):
+        return f"{self.name} ({self.total_size} bytes)"
+
+
+class UploadChunk(models.Model):
+    """Model to record a chunk of an UploadSession that was received and verified"""
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='chunks')
+    index = models.IntegerField()
+    size = models.IntegerField()
+    checksum = models.CharField(max_length=64)
+    
+    class Meta:
+        unique_together = [('session', 'index')]
+    
+    def __str__(self):
+        return f"{self.session_id} #{self.index}"
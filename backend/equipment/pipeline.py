@@ -0,0 +1,115 @@
+"""Turn an uploaded CSV into a stored, committed EquipmentDataset"""
+import hashlib
+import logging
+import os
+from datetime import datetime
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .cache import bump_data_version
+from .models import EquipmentDataset, EquipmentReading, EquipmentTypeDistribution
+from .ingest import ingest_csv
+from .stats import compute_statistics, save_statistics
+from .timeseries import store_readings
+from .anomalies import find_anomalies, save_anomalies
+from .storage import DATASET_EXTENSION, remove_dataset_files
+
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_file_path(name):
+    """Unique path under MEDIA_ROOT/uploads for the stored copy of an upload"""
+    media_dir = os.path.join(settings.MEDIA_ROOT, 'uploads')
+    os.makedirs(media_dir, exist_ok=True)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(media_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{stem}{DATASET_EXTENSION}")
+
+
+def upload_digest(uploaded_file):
+    """SHA-256 of an uploaded file, read chunk by chunk; the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def find_duplicate(content_hash):
+    """The newest dataset stored from byte-identical upload, or None"""
+    if not content_hash:
+        return None
+    # Repeating the constraint's condition lets SQLite use its partial index
+    datasets = EquipmentDataset.objects.filter(content_hash=content_hash).exclude(content_hash='')
+    return datasets.order_by('-uploaded_at').first()
+
+
+class DuplicateUpload(Exception):
+    """An identical upload committed first; dataset is the one it created"""
+
+    def __init__(self, dataset):
+        super().__init__(f'Identical to dataset {dataset.id}')
+        self.dataset = dataset
+
+
+def create_dataset(source, name, progress=None, content_hash=''):
+    """Parse, store and commit an uploaded CSV; returns (dataset, aggregates).
+
+    source is any binary file object. progress, if given, is called with
+    the number of bytes parsed so far after every chunk. On failure
+    nothing is committed and the stored file is removed. content_hash
+    is the SHA-256 of the uploaded bytes, recorded for deduplication;
+    if another upload with the same hash commits first, DuplicateUpload
+    is raised. The time-series readings are stored after the dataset
+    commits, and cached responses are invalidated again once they are;
+    failing to store them is logged and does not fail the upload.
+    Retention is not applied here; a background sweep runs once the
+    dataset commits.
+    """
+    file_path = dataset_file_path(name)
+    try:
+        # Parse the upload chunk by chunk into a columnar Arrow file
+        aggregates = ingest_csv(source, file_path, progress=progress)
+        statistics = compute_statistics(file_path)
+        anomalies = find_anomalies(file_path, statistics)
+        
+        # Commit the dataset and everything derived from it atomically
+        with transaction.atomic():
+            dataset = EquipmentDataset.objects.create(
+                name=name,
+                file_path=file_path,
+                file_size=os.path.getsize(file_path),
+                content_hash=content_hash,
+                total_count=aggregates.total_count,
+                avg_flowrate=aggregates.mean('Flowrate'),
+                avg_pressure=aggregates.mean('Pressure'),
+                avg_temperature=aggregates.mean('Temperature')
+            )
+            EquipmentTypeDistribution.objects.bulk_create([
+                EquipmentTypeDistribution(dataset=dataset, equipment_type=eq_type, count=count,
+                                          **statistics['aggregates'].get(eq_type, {}))
+                for eq_type, count in aggregates.type_distribution().items()
+            ])
+            save_statistics(dataset, statistics)
+            save_anomalies(dataset, anomalies)
+    except IntegrityError:
+        remove_dataset_files(file_path)
+        # The unique content_hash constraint lost a race with an identical upload
+        duplicate = find_duplicate(content_hash)
+        if duplicate is None:
+            raise
+        raise DuplicateUpload(duplicate)
+    except Exception:
+        remove_dataset_files(file_path)
+        raise
+    
+    # Readings commit in batches of their own, so the dataset transaction stays short
+    try:
+        store_readings(dataset, file_path)
+    except Exception:
+        logger.exception('Storing readings of dataset %s failed', dataset.id)
+        EquipmentReading.objects.filter(dataset=dataset).delete()
+    # The dataset's commit bumped the version before its readings existed
+    bump_data_version()
+    return dataset, aggregates
+
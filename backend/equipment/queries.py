@@ -0,0 +1,226 @@
+"""Row queries over stored datasets: filtering, column projection, sorting and pagination.
+
+Sorting is served from a persisted sort index: the first request sorted
+by a column computes the row permutation once and stores it next to the
+dataset as a small Arrow file. Later pages memory-map that index and
+gather only the rows they return, so fetching page N costs O(page size)
+rather than O(N).
+
+Filters are given as Column=value or Column__op=value query parameters and
+are evaluated as vectorized Arrow compute kernels over whole columns.
+"""
+import os
+import uuid
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .storage import open_table
+
+
+MAX_PAGE_SIZE = 10000
+# Rows per page when no limit is given
+DEFAULT_PAGE_SIZE = 1000
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {'offset', 'limit', 'fields', 'sort', 'format'}
+
+FILTER_OPERATORS = {
+    'eq': pc.equal,
+    'ne': pc.not_equal,
+    'gt': pc.greater,
+    'gte': pc.greater_equal,
+    'lt': pc.less,
+    'lte': pc.less_equal,
+}
+
+
+def parse_int(params, name, default=None, minimum=0):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}")
+    return value
+
+
+def parse_fields(params, columns):
+    """Columns requested with fields=a,b,c (all columns when absent)"""
+    value = params.get('fields')
+    if not value:
+        return list(columns)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+def parse_sort(params, columns):
+    """Return (column, descending) for sort=Column or sort=-Column, or None"""
+    value = params.get('sort')
+    if not value:
+        return None
+    descending = value.startswith('-')
+    column = value.lstrip('-')
+    if column not in columns:
+        raise ValueError(f'Unknown sort field: {column}')
+    return column, descending
+
+
+def parse_value(value, column_type):
+    if pa.types.is_floating(column_type) or pa.types.is_integer(column_type):
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a number")
+    return value
+
+
+def parse_filters(params, schema):
+    """Parse Column=value / Column__op=value parameters into (column, op, value) triples.
+
+    Operators: eq (default), ne, gt, gte, lt, lte, between=low,high,
+    in=a,b,c, contains (strings only) and isnull=true/false.
+    """
+    items = params.lists() if hasattr(params, 'lists') else ((key, [value]) for key, value in params.items())
+    filters = []
+    for key, values in items:
+        if key in RESERVED_PARAMS:
+            continue
+        column, _, op = key.partition('__')
+        op = op or 'eq'
+        if column not in schema.names:
+            raise ValueError(f'Unknown filter field: {column}')
+        column_type = schema.field(column).type
+        for value in values:
+            if op in FILTER_OPERATORS:
+                value = parse_value(value, column_type)
+            elif op == 'between':
+                bounds = value.split(',')
+                if len(bounds) != 2:
+                    raise ValueError(f"'{key}' expects two comma-separated values")
+                value = [parse_value(bound, column_type) for bound in bounds]
+            elif op == 'in':
+                value = [parse_value(item, column_type) for item in value.split(',')]
+            elif op == 'contains':
+                if not pa.types.is_string(column_type):
+                    raise ValueError(f"'{key}' requires a text field")
+            elif op == 'isnull':
+                value = value.lower() in ('1', 'true', 'yes')
+            else:
+                raise ValueError(f'Unknown filter operator: {op}')
+            filters.append((column, op, value))
+    return filters
+
+
+def filter_mask(table, filters):
+    """Boolean mask of rows matching every filter, or None when there are no filters"""
+    mask = None
+    for column, op, value in filters:
+        values = table[column]
+        if op in FILTER_OPERATORS:
+            predicate = FILTER_OPERATORS[op](values, value)
+        elif op == 'between':
+            predicate = pc.and_(pc.greater_equal(values, value[0]), pc.less_equal(values, value[1]))
+        elif op == 'in':
+            predicate = pc.is_in(values, value_set=pa.array(value, type=values.type))
+        elif op == 'contains':
+            predicate = pc.match_substring(values, value)
+        else:
+            predicate = pc.is_null(values) if value else pc.is_valid(values)
+        # Comparisons against nulls never match
+        predicate = pc.fill_null(predicate, False)
+        mask = predicate if mask is None else pc.and_(mask, predicate)
+    return mask
+
+
+def sort_index_path(file_path, column_position, descending):
+    order = 'desc' if descending else 'asc'
+    return f'{file_path}.sort{column_position}.{order}.arrow'
+
+
+def load_sort_index(file_path, table, column, descending):
+    """Row permutation sorting column (nulls last), computed once and persisted beside the dataset"""
+    index_path = sort_index_path(file_path, table.schema.get_field_index(column), descending)
+    if not os.path.exists(index_path):
+        order = 'descending' if descending else 'ascending'
+        indices = pc.sort_indices(table, sort_keys=[(column, order)])
+        index_table = pa.table({'index': indices})
+        tmp_path = f'{index_path}.{uuid.uuid4().hex}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, index_table.schema) as writer:
+                writer.write_table(index_table)
+        os.replace(tmp_path, index_path)
+    source = pa.memory_map(index_path, 'r')
+    return pa.ipc.open_file(source).read_all().column('index')
+
+
+def take_rows(table, indices):
+    """Gather rows by position without concatenating the table's record batches"""
+    indices = np.asarray(indices, dtype=np.int64)
+    batches = table.to_batches()
+    offsets = np.cumsum([0] + [batch.num_rows for batch in batches])
+    batch_ids = np.searchsorted(offsets, indices, side='right') - 1
+    order = np.argsort(batch_ids, kind='stable')
+    parts = [
+        batches[batch_id].take(pa.array(indices[batch_ids == batch_id] - offsets[batch_id]))
+        for batch_id in np.unique(batch_ids)
+    ]
+    gathered = pa.Table.from_batches(parts, schema=table.schema)
+    # Parts come back grouped by batch; put rows back in the requested order
+    return gathered.take(pa.array(np.argsort(order)))
+
+
+def query_rows(file_path, params, as_table=False):
+    """Run a paginated row query against a stored dataset.
+
+    Supported parameters: offset, limit (at least 1, capped at
+    MAX_PAGE_SIZE; DEFAULT_PAGE_SIZE when omitted), fields=a,b for
+    projection, sort=Column / sort=-Column, and any column filters
+    understood by parse_filters. total counts the rows matching the
+    filters. Rows are returned as a list of dicts, or as an Arrow table
+    with as_table. Raises ValueError for invalid parameters.
+    """
+    table = open_table(file_path)
+    fields = parse_fields(params, table.column_names)
+    sort = parse_sort(params, table.column_names)
+    filters = parse_filters(params, table.schema)
+    offset = parse_int(params, 'offset', default=0)
+    limit = min(parse_int(params, 'limit', default=DEFAULT_PAGE_SIZE, minimum=1), MAX_PAGE_SIZE)
+
+    # Positions of the matching rows in output order; None means every row in file order
+    mask = filter_mask(table, filters)
+    if sort:
+        column, descending = sort
+        rows = load_sort_index(file_path, table, column, descending)
+        if mask is not None:
+            rows = rows.filter(mask.take(rows))
+    elif mask is not None:
+        rows = pc.indices_nonzero(mask)
+    else:
+        rows = None
+    total = table.num_rows if rows is None else len(rows)
+
+    offset = min(offset, total)
+    limit = min(limit, total - offset)
+
+    # Only the rows of the page are gathered, never every match
+    if rows is None:
+        page = table.select(fields).slice(offset, limit)
+    else:
+        page = take_rows(table.select(fields), rows.slice(offset, limit).to_numpy())
+
+    next_offset = offset + limit
+    return {
+        'data': page if as_table else page.to_pylist(),
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'next_offset': next_offset if next_offset < total else None,
+        'fields': fields,
+    }
@@ -0,0 +1,61 @@
+"""Opt-in JSON renderers for large responses.
+
+Views that list these next to DRF's defaults keep answering plain
+application/json as before; clients opt in with ?format=orjson or
+?format=columnar.
+
+ORJSONRenderer encodes the same payload with orjson, several times faster
+than the standard library. ColumnarJSONRenderer additionally accepts Arrow
+tables in the payload and writes them as {column: [values]}, straight from
+the column arrays, so no per-row Python dict is ever built. Both fall back
+to the standard encoder when orjson is not installed.
+"""
+import pyarrow as pa
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    format = 'orjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Decimals, lazy strings and the like go through DRF's encoder
+        return orjson.dumps(data, default=JSONEncoder().default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def column_values(column):
+    """JSON-ready values of an Arrow column: a NumPy array where orjson can take one"""
+    numeric = pa.types.is_floating(column.type) or (pa.types.is_integer(column.type) and not column.null_count)
+    if orjson is not None and numeric:
+        # Float nulls become NaN, which orjson writes as null
+        return column.to_numpy()
+    return column.to_pylist()
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    """Renders top-level Arrow table values as {column: [values]}"""
+    format = 'columnar'
+    columnar = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = {
+                key: {name: column_values(value[name]) for name in value.column_names}
+                if isinstance(value, pa.Table) else value
+                for key, value in data.items()
+            }
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def accepts_tables(request):
+    """Whether the renderer chosen for request can encode Arrow tables"""
+    return getattr(request.accepted_renderer, 'columnar', False)
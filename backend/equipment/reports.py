@@ -0,0 +1,178 @@
+"""PDF reports, rendered once per dataset and template version and then served from disk.
+
+A dataset's statistics never change after upload, so a rendered report
+stays valid until REPORT_TEMPLATE_VERSION is bumped; stale versions are
+simply never looked up again.
+
+Charts are rasterized by equipment.charts in a process pool and embedded
+as PNG images; the finished file is streamed to clients in blocks.
+"""
+import glob
+import io
+import os
+import uuid
+from django.conf import settings
+from django.db import close_old_connections
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+
+from .charts import FIGURE_SIZE, render_charts
+from .retention import local_file_path
+
+
+# Bump whenever build_report changes what a report looks like
+REPORT_TEMPLATE_VERSION = 2
+
+
+REPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def format_stat(value):
+    return f"{value:.2f}" if value is not None else "N/A"
+
+
+def reports_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'reports')
+
+
+def report_path(dataset_id):
+    return os.path.join(reports_dir(), f'{dataset_id}_v{REPORT_TEMPLATE_VERSION}.pdf')
+
+
+def build_report(dataset, output):
+    """Write the PDF report for dataset to output (a path or binary file object)"""
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    story = []
+    styles = getSampleStyleSheet()
+    
+    # Title
+    title = Paragraph(f"Chemical Equipment Report - {dataset.name}", styles['Title'])
+    story.append(title)
+    story.append(Spacer(1, 0.2*inch))
+    
+    # Summary information
+    story.append(Paragraph(f"<b>Upload Date:</b> {dataset.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    story.append(Spacer(1, 0.1*inch))
+    
+    # Summary table
+    summary_data = [
+        ['Metric', 'Value'],
+        ['Total Equipment Count', str(dataset.total_count)],
+        ['Average Flowrate', f"{dataset.avg_flowrate:.2f}" if dataset.avg_flowrate else "N/A"],
+        ['Average Pressure', f"{dataset.avg_pressure:.2f}" if dataset.avg_pressure else "N/A"],
+        ['Average Temperature', f"{dataset.avg_temperature:.2f}" if dataset.avg_temperature else "N/A"],
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(REPORT_TABLE_STYLE)
+    story.append(summary_table)
+    story.append(Spacer(1, 0.2*inch))
+    
+    # Equipment type distribution
+    story.append(Paragraph("<b>Equipment Type Distribution</b>", styles['Heading2']))
+    story.append(Spacer(1, 0.1*inch))
+    
+    type_distributions = dataset.type_distributions.all()
+    if type_distributions:
+        dist_data = [['Equipment Type', 'Count']]
+        for dist in type_distributions:
+            dist_data.append([dist.equipment_type, str(dist.count)])
+        
+        dist_table = Table(dist_data, colWidths=[3*inch, 2*inch])
+        dist_table.setStyle(REPORT_TABLE_STYLE)
+        story.append(dist_table)
+    
+    # Column statistics, precomputed at upload
+    column_statistics = dataset.column_statistics.all()
+    if column_statistics:
+        story.append(Spacer(1, 0.2*inch))
+        story.append(Paragraph("<b>Column Statistics</b>", styles['Heading2']))
+        story.append(Spacer(1, 0.1*inch))
+        
+        stats_data = [['Column', 'Min', 'Max', 'Mean', 'Std Dev', 'P50', 'P95', 'P99']]
+        for stats in column_statistics:
+            stats_data.append([stats.column] + [
+                format_stat(value) for value in (stats.min_value, stats.max_value, stats.mean,
+                                                 stats.std, stats.p50, stats.p95, stats.p99)
+            ])
+        
+        stats_table = Table(stats_data, colWidths=[1.2*inch] + [0.8*inch] * 7)
+        stats_table.setStyle(REPORT_TABLE_STYLE)
+        story.append(stats_table)
+    
+    # Per-type averages
+    type_statistics = dataset.type_statistics.all()
+    if type_statistics:
+        story.append(Spacer(1, 0.2*inch))
+        story.append(Paragraph("<b>Averages by Equipment Type</b>", styles['Heading2']))
+        story.append(Spacer(1, 0.1*inch))
+        
+        type_data = [['Equipment Type', 'Count', 'Flowrate', 'Pressure', 'Temperature']]
+        for stats in type_statistics:
+            type_data.append([stats.equipment_type, str(stats.count), format_stat(stats.mean_flowrate),
+                              format_stat(stats.mean_pressure), format_stat(stats.mean_temperature)])
+        
+        type_table = Table(type_data, colWidths=[2.2*inch, 0.8*inch, 1.2*inch, 1.2*inch, 1.2*inch])
+        type_table.setStyle(REPORT_TABLE_STYLE)
+        story.append(type_table)
+    
+    # Charts
+    file_path = local_file_path(dataset)
+    if os.path.exists(file_path):
+        story.append(PageBreak())
+        story.append(Paragraph("<b>Charts</b>", styles['Heading2']))
+        story.append(Spacer(1, 0.1*inch))
+        
+        width = 7*inch
+        height = width * FIGURE_SIZE[1] / FIGURE_SIZE[0]
+        for png in render_charts(file_path, settings.REPORT_RENDER_PROCESSES):
+            story.append(Image(io.BytesIO(png), width=width, height=height))
+            story.append(Spacer(1, 0.15*inch))
+    
+    doc.build(story)
+
+
+def render_report(dataset):
+    """Return the path of dataset's rendered report, rendering it first if needed"""
+    path = report_path(dataset.id)
+    if not os.path.exists(path):
+        os.makedirs(reports_dir(), exist_ok=True)
+        # Render to a private file, then rename so readers never see a partial PDF
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            build_report(dataset, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return path
+
+
+def remove_reports(dataset_id):
+    """Delete every rendered report of a dataset, whatever its template version"""
+    for path in glob.glob(os.path.join(reports_dir(), f'{dataset_id}_v*.pdf')):
+        os.remove(path)
+
+
+def prerender_report(dataset_id):
+    """Render a new dataset's report in the background so the first download is instant"""
+    from .models import EquipmentDataset
+    close_old_connections()
+    try:
+        dataset = EquipmentDataset.objects.filter(id=dataset_id).first()
+        if dataset:
+            render_report(dataset)
+    finally:
+        close_old_connections()
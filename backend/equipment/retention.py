@@ -0,0 +1,195 @@
+"""Dataset retention with a hot and a cold storage tier.
+
+The DATASET_RETENTION setting holds two sets of limits, each by count,
+age and total bytes (size of the uncompressed dataset files, newest
+first). Datasets beyond any HOT_* limit have their file gzipped into
+MEDIA_ROOT/archive. Datasets beyond any MAX_* limit are deleted.
+Time-series readings, which outlive their dataset, are deleted once older
+than READINGS_DAYS, and chunked upload sessions, finalized or abandoned,
+once older than UPLOAD_SESSION_HOURS. A limit of None is disabled.
+
+Archived datasets keep all of their precomputed statistics in the
+database, so summaries, history, trends and reports need no file. Row
+queries, exports and comparisons restore a temporary hot copy on demand
+with local_file_path(). Later sweeps remove that copy once it is older
+than REHYDRATED_HOURS.
+
+Sweeps run in the background after every upload, and can also be run
+with `python manage.py sweep_retention`, e.g. from cron so that age
+limits apply even when nothing is uploaded.
+"""
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .models import EquipmentDataset
+from .storage import remove_dataset_files
+from .timeseries import prune_readings
+from .uploads import expire_sessions
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION = {
+    'HOT_COUNT': 5,
+    'HOT_DAYS': None,
+    'HOT_BYTES': None,
+    'MAX_COUNT': None,
+    'MAX_DAYS': None,
+    'MAX_BYTES': None,
+    'READINGS_DAYS': None,
+    'REHYDRATED_HOURS': 24,
+    'UPLOAD_SESSION_HOURS': 48,
+    'SWEEP_ON_UPLOAD': True,
+}
+
+_sweep_lock = threading.Lock()
+
+
+def retention_policy():
+    return {**DEFAULT_RETENTION, **getattr(settings, 'DATASET_RETENTION', {})}
+
+
+def archive_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'archive')
+
+
+def archive_path(file_path):
+    return os.path.join(archive_dir(), f'{os.path.basename(file_path)}.gz')
+
+
+def beyond_limits(datasets, count, days, max_bytes):
+    """Ids of datasets (newest first, as (id, uploaded_at, file_size)) outside any limit"""
+    cutoff = timezone.now() - timedelta(days=days) if days is not None else None
+    expired = []
+    total_bytes = 0
+    for position, (dataset_id, uploaded_at, file_size) in enumerate(datasets):
+        total_bytes += file_size
+        if ((count is not None and position >= count)
+                or (cutoff is not None and uploaded_at < cutoff)
+                or (max_bytes is not None and total_bytes > max_bytes)):
+            expired.append(dataset_id)
+    return expired
+
+
+def delete_datasets(dataset_ids):
+    """Delete datasets in one set-based DELETE; their files go once it commits"""
+    with transaction.atomic():
+        paths = list(EquipmentDataset.objects.filter(id__in=dataset_ids).values_list('file_path', flat=True))
+        EquipmentDataset.objects.filter(id__in=dataset_ids).delete()
+        transaction.on_commit(lambda: [remove_all_copies(path) for path in paths])
+
+
+def remove_all_copies(file_path):
+    remove_dataset_files(file_path)
+    if os.path.exists(archive_path(file_path)):
+        os.remove(archive_path(file_path))
+
+
+def archive_dataset(dataset):
+    """Gzip a hot dataset's file into the archive and drop the uncompressed copy"""
+    if not os.path.exists(dataset.file_path):
+        return False
+    destination = archive_path(dataset.file_path)
+    os.makedirs(archive_dir(), exist_ok=True)
+    tmp_path = f'{destination}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(dataset.file_path, 'rb') as source, gzip.open(tmp_path, 'wb', compresslevel=6) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    updated = EquipmentDataset.objects.filter(id=dataset.id, storage_tier=EquipmentDataset.TIER_HOT).update(
+        storage_tier=EquipmentDataset.TIER_ARCHIVED, archived_at=timezone.now()
+    )
+    # Sort indices are cheap to rebuild and are dropped along with the file
+    remove_dataset_files(dataset.file_path)
+    return bool(updated)
+
+
+def local_file_path(dataset):
+    """Path of the dataset's uncompressed file, restoring it from the archive if needed"""
+    if dataset.storage_tier != EquipmentDataset.TIER_ARCHIVED or os.path.exists(dataset.file_path):
+        return dataset.file_path
+    source_path = archive_path(dataset.file_path)
+    if not os.path.exists(source_path):
+        return dataset.file_path
+    tmp_path = f'{dataset.file_path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with gzip.open(source_path, 'rb') as source, open(tmp_path, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(tmp_path, dataset.file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dataset.file_path
+
+
+def drop_rehydrated_copies(hours):
+    """Remove hot copies of archived datasets restored more than `hours` ago"""
+    cutoff = time.time() - hours * 3600
+    paths = EquipmentDataset.objects.filter(storage_tier=EquipmentDataset.TIER_ARCHIVED).values_list(
+        'file_path', flat=True
+    )
+    dropped = 0
+    for path in paths.iterator():
+        if os.path.exists(path) and os.path.getmtime(path) < cutoff:
+            remove_dataset_files(path)
+            dropped += 1
+    return dropped
+
+
+def sweep_retention():
+    """Apply the retention policy once; returns counts of everything deleted, archived, dropped or expired"""
+    policy = retention_policy()
+    datasets = list(EquipmentDataset.objects.order_by('-uploaded_at').values_list('id', 'uploaded_at', 'file_size'))
+
+    deleted = beyond_limits(datasets, policy['MAX_COUNT'], policy['MAX_DAYS'], policy['MAX_BYTES'])
+    if deleted:
+        delete_datasets(deleted)
+
+    deleted_ids = set(deleted)
+    cold_ids = [
+        dataset_id for dataset_id in beyond_limits(datasets, policy['HOT_COUNT'], policy['HOT_DAYS'],
+                                                   policy['HOT_BYTES'])
+        if dataset_id not in deleted_ids
+    ]
+    archived = 0
+    for dataset in EquipmentDataset.objects.filter(id__in=cold_ids, storage_tier=EquipmentDataset.TIER_HOT):
+        archived += archive_dataset(dataset)
+
+    if archived:
+        # Tier changes are bulk updates, which send no signals
+        bump_data_version()
+    dropped = drop_rehydrated_copies(policy['REHYDRATED_HOURS'])
+    readings = prune_readings(policy['READINGS_DAYS']) if policy['READINGS_DAYS'] is not None else 0
+    if readings:
+        bump_data_version()
+    sessions = expire_sessions(policy['UPLOAD_SESSION_HOURS']) if policy['UPLOAD_SESSION_HOURS'] is not None else 0
+    return {'deleted': len(deleted), 'archived': archived, 'rehydrated_dropped': dropped,
+            'readings_pruned': readings, 'sessions_expired': sessions}
+
+
+def run_sweep():
+    """Background entry point; skips the sweep if another one is already running"""
+    if not _sweep_lock.acquire(blocking=False):
+        return
+    close_old_connections()
+    try:
+        sweep_retention()
+    except Exception:
+        logger.exception('Retention sweep failed')
+    finally:
+        _sweep_lock.release()
+        close_old_connections()
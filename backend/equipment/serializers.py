@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import EquipmentDataset, EquipmentTypeDistribution
+from .models import (EquipmentDataset, EquipmentTypeDistribution, ColumnStatistics, TypeStatistics,
+                     AnomalousReading, IngestionJob, UploadSession)
 
 
 class EquipmentTypeDistributionSerializer(serializers.ModelSerializer):
@@ -14,12 +15,63 @@ class EquipmentDatasetSerializer(serializers.ModelSerializer):
     class Meta:
         model = EquipmentDataset
         fields = ['id', 'name', 'uploaded_at', 'total_count', 'avg_flowrate', 
-                 'avg_pressure', 'avg_temperature', 'type_distributions']
+                 'avg_pressure', 'avg_temperature', 'type_distributions',
+                 'file_size', 'storage_tier', 'archived_at']
+
+
+class DatasetHistorySerializer(EquipmentDatasetSerializer):
+    """Dataset metadata without the nested type distributions"""
+    type_distributions = None
+    
+    class Meta(EquipmentDatasetSerializer.Meta):
+        fields = [field for field in EquipmentDatasetSerializer.Meta.fields if field != 'type_distributions']
+
+
+class ColumnStatisticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ColumnStatistics
+        fields = ['count', 'min_value', 'max_value', 'mean', 'std', 'p50', 'p95', 'p99']
+
+
+class TypeStatisticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TypeStatistics
+        fields = ['count', 'mean_flowrate', 'mean_pressure', 'mean_temperature',
+                 'std_flowrate', 'std_pressure', 'std_temperature']
+
+
+class AnomalousReadingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnomalousReading
+        fields = ['row_index', 'equipment_name', 'equipment_type', 'metric', 'value',
+                 'expected', 'zscore', 'method']
 
 
 class DataSummarySerializer(serializers.Serializer):
+    dataset_id = serializers.IntegerField(required=False)
     total_count = serializers.IntegerField()
     avg_flowrate = serializers.FloatField()
     avg_pressure = serializers.FloatField()
     avg_temperature = serializers.FloatField()
     equipment_type_distribution = serializers.DictField()
+    statistics = serializers.DictField(required=False)
+    type_statistics = serializers.DictField(required=False)
+
+
+class IngestionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestionJob
+        fields = ['id', 'name', 'status', 'progress', 'error', 'dataset', 'duplicate',
+                 'created_at', 'started_at', 'finished_at']
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    total_chunks = serializers.IntegerField(read_only=True)
+    received = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'name', 'total_size', 'chunk_size', 'total_chunks', 'received', 'job', 'created_at']
+    
+    def get_received(self, obj):
+        return sorted(obj.chunks.values_list('index', flat=True))
@@ -0,0 +1,53 @@
+import logging
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_data_version
+from .jobs import resume_jobs, submit
+from .models import EquipmentDataset
+from .reports import prerender_report, remove_reports
+from .retention import retention_policy, run_sweep
+
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=EquipmentDataset)
+@receiver(post_delete, sender=EquipmentDataset)
+def invalidate_cached_responses(sender, **kwargs):
+    """Expire cached summaries and history once the change is committed"""
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(post_save, sender=EquipmentDataset)
+def schedule_report_prerender(sender, instance, created, **kwargs):
+    if created and settings.REPORT_PRERENDER:
+        dataset_id = instance.id
+        transaction.on_commit(lambda: submit(prerender_report, dataset_id))
+
+
+@receiver(post_save, sender=EquipmentDataset)
+def schedule_retention_sweep(sender, instance, created, **kwargs):
+    """Apply the retention policy in the background instead of during the upload"""
+    if created and retention_policy()['SWEEP_ON_UPLOAD']:
+        transaction.on_commit(lambda: submit(run_sweep))
+
+
+@receiver(post_delete, sender=EquipmentDataset)
+def delete_rendered_reports(sender, instance, **kwargs):
+    # Django clears instance.pk after the delete, so capture the id now
+    dataset_id = instance.id
+    transaction.on_commit(lambda: remove_reports(dataset_id))
+
+
+@receiver(request_started)
+def resume_ingestion_jobs(sender, **kwargs):
+    """Once per process, on its first request, pick up jobs a dead worker left behind"""
+    request_started.disconnect(resume_ingestion_jobs)
+    try:
+        resume_jobs()
+    except DatabaseError:
+        logger.exception('Could not resume ingestion jobs')
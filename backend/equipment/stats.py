@@ -0,0 +1,311 @@
+"""Descriptive statistics computed once at upload time, one record batch at a time.
+
+Per equipment type, each batch contributes counts, sums, sums of squares,
+extremes, means and variances that are merged into running totals, so
+memory stays bounded by the batch size whatever the file size. Means and
+standard deviations are merged from the per-batch means and variances
+rather than derived from the sums of squares, which lose precision.
+
+Percentiles and per-type quartiles are exact, with the same linear
+interpolation as pc.quantile, found in two more passes: the first
+histograms every column and type between its extremes to locate the bin
+holding each wanted rank, the second collects only the values in those
+bins.
+
+Datasets uploaded before these statistics were recorded are filled in with
+`python manage.py backfill_statistics`.
+"""
+import math
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ColumnStatistics, EquipmentDataset, EquipmentTypeDistribution, TypeStatistics
+from .storage import NUMERIC_COLUMNS, iter_batches
+
+
+PERCENTILES = [0.5, 0.95, 0.99]
+QUARTILES = [0.25, 0.75]
+# Histogram cells shared by all columns and types; bins per group are capped at MAX_BINS
+HISTOGRAM_CELLS = 1 << 20
+MAX_BINS = 1024
+AGGREGATE_FIELDS = [f'{column.lower()}_{part}' for column in NUMERIC_COLUMNS
+                    for part in ('count', 'sum', 'sumsq', 'min', 'max')]
+
+
+class Moments:
+    """Count, sum, sum of squares, extremes, mean and M2 of one column's values, merged batch by batch"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, count, total, squares, minimum, maximum, mean, variance):
+        """Merge in the moments of another set of values; variance has ddof=0"""
+        if not count:
+            return
+        combined = self.count + count
+        delta = mean - self.mean
+        self.m2 += variance * count + delta * delta * self.count * count / combined
+        self.mean += delta * count / combined
+        self.count = combined
+        self.total += total
+        self.squares += squares
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    def merge(self, other):
+        if other.count:
+            self.add(other.count, other.total, other.squares, other.minimum, other.maximum,
+                     other.mean, other.m2 / other.count)
+
+    def average(self):
+        return self.mean if self.count else None
+
+    def std(self):
+        """Sample standard deviation, like pc.stddev(ddof=1)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+
+
+def batch_moments(batch):
+    """Per-type rows of count_all plus the moments of each numeric column within one record batch"""
+    table = pa.Table.from_batches([batch])
+    aggregations = [([], 'count_all')]
+    for column in NUMERIC_COLUMNS:
+        table = table.append_column(f'{column}_squared', pc.multiply(table[column], table[column]))
+        aggregations.append((column, 'count'))
+        aggregations.append((column, 'sum'))
+        aggregations.append((column, 'min_max'))
+        aggregations.append((column, 'mean'))
+        aggregations.append((column, 'variance', pc.VarianceOptions(ddof=0)))
+        aggregations.append((f'{column}_squared', 'sum'))
+    return table.group_by('Type').aggregate(aggregations).to_pylist()
+
+
+def type_moments(file_path):
+    """Return ({type: row count}, {type: {column: Moments}}); rows without a type are keyed None"""
+    counts = {}
+    moments = {}
+    for batch in iter_batches(file_path, columns=['Type'] + NUMERIC_COLUMNS):
+        for row in batch_moments(batch):
+            eq_type = row['Type']
+            counts[eq_type] = counts.get(eq_type, 0) + row['count_all']
+            by_column = moments.setdefault(eq_type, {column: Moments() for column in NUMERIC_COLUMNS})
+            for column in NUMERIC_COLUMNS:
+                by_column[column].add(
+                    row[f'{column}_count'], row[f'{column}_sum'] or 0.0, row[f'{column}_squared_sum'] or 0.0,
+                    row[f'{column}_min_max']['min'], row[f'{column}_min_max']['max'],
+                    row[f'{column}_mean'] or 0.0, row[f'{column}_variance'] or 0.0,
+                )
+    return counts, moments
+
+
+def interpolation_ranks(count, q):
+    """(lower rank, upper rank, fraction) of quantile q among count sorted values, as pc.quantile computes it"""
+    position = q * (count - 1)
+    lower = math.floor(position)
+    return lower, min(lower + 1, count - 1), position - lower
+
+
+def select_ranks(read_values, lows, highs, wanted):
+    """Exact order statistics of grouped values in two passes over read_values.
+
+    read_values() starts a pass and yields (groups, values) NumPy arrays;
+    lows and highs hold each group's extremes. wanted maps (group, rank)
+    to None and is filled in with the value of that 0-based rank. Bins
+    are computed identically in both passes and are monotonic in the
+    value, so every rank falls into a known bin.
+    """
+    group_count = len(lows)
+    bins = max(1, min(MAX_BINS, HISTOGRAM_CELLS // group_count))
+    spans = highs - lows
+    scales = np.divide(bins, spans, out=np.zeros_like(spans), where=spans > 0)
+
+    def cells(groups, values):
+        positions = ((values - lows[groups]) * scales[groups]).astype(np.int64)
+        return groups * bins + np.clip(positions, 0, bins - 1)
+
+    histogram = np.zeros(group_count * bins, dtype=np.int64)
+    for groups, values in read_values():
+        histogram += np.bincount(cells(groups, values), minlength=len(histogram))
+    cumulative = np.cumsum(histogram.reshape(group_count, bins), axis=1)
+
+    # The cell holding each rank, and how many of the group's values lie below it
+    targets = {}
+    for group, rank in wanted:
+        position = int(np.searchsorted(cumulative[group], rank, side='right'))
+        below = int(cumulative[group][position - 1]) if position else 0
+        targets[(group, rank)] = (group * bins + position, rank - below)
+    target_cells = np.unique([cell for cell, _ in targets.values()])
+
+    # Duplicates are counted rather than kept, so a bin of repeated values stays small
+    parts = []
+    for groups, values in read_values():
+        selected = cells(groups, values)
+        keep = np.isin(selected, target_cells)
+        parts.append((selected[keep], values[keep]))
+    selected = np.concatenate([cell for cell, _ in parts])
+    values = np.concatenate([value for _, value in parts])
+    order = np.lexsort((values, selected))
+    selected, values = selected[order], values[order]
+    for (group, rank), (cell, offset) in targets.items():
+        start = np.searchsorted(selected, cell, side='left')
+        wanted[(group, rank)] = float(values[start + offset])
+    return wanted
+
+
+def quantiles(wanted, group, count, qs):
+    """Interpolate qs for a group from the order statistics selected into wanted"""
+    if not count:
+        return [None] * len(qs)
+    result = []
+    for q in qs:
+        lower, upper, fraction = interpolation_ranks(count, q)
+        result.append((1 - fraction) * wanted[(group, lower)] + fraction * wanted[(group, upper)])
+    return result
+
+
+def compute_quantiles(file_path, types, columns, moments):
+    """Percentiles per column and quartiles per (type, column), selected exactly in two passes.
+
+    Groups are numbered column by column: the types in order, then one
+    group for all of the column's rows.
+    """
+    per_column = len(types) + 1
+    keys = [(column, eq_type) for column in NUMERIC_COLUMNS for eq_type in types + [None]]
+    counts = [columns[column].count if eq_type is None else moments[eq_type][column].count for column, eq_type in keys]
+    lows = np.array([(columns[column] if eq_type is None else moments[eq_type][column]).minimum or 0.0
+                     for column, eq_type in keys])
+    highs = np.array([(columns[column] if eq_type is None else moments[eq_type][column]).maximum or 0.0
+                      for column, eq_type in keys])
+
+    wanted = {}
+    for group, (column, eq_type) in enumerate(keys):
+        for q in (PERCENTILES if eq_type is None else QUARTILES):
+            if counts[group]:
+                lower, upper, _ = interpolation_ranks(counts[group], q)
+                wanted[(group, lower)] = wanted[(group, upper)] = None
+
+    type_set = pa.array(types, pa.string())
+
+    def read_values():
+        for batch in iter_batches(file_path, columns=['Type'] + NUMERIC_COLUMNS):
+            # Rows without a type only count towards their column
+            positions = pc.fill_null(pc.index_in(batch.column('Type'), value_set=type_set), -1).to_numpy()
+            for offset, column in enumerate(NUMERIC_COLUMNS):
+                values = batch.column(column).to_numpy(zero_copy_only=False)
+                valid = ~np.isnan(values)
+                typed = valid & (positions >= 0)
+                yield (np.concatenate([positions[typed] + offset * per_column,
+                                       np.full(int(valid.sum()), offset * per_column + len(types))]),
+                       np.concatenate([values[typed], values[valid]]))
+
+    if wanted:
+        select_ranks(read_values, lows, highs, wanted)
+
+    percentiles = {}
+    type_quartiles = {eq_type: {} for eq_type in types}
+    for group, (column, eq_type) in enumerate(keys):
+        if eq_type is None:
+            percentiles[column] = quantiles(wanted, group, counts[group], PERCENTILES)
+        else:
+            type_quartiles[eq_type][column] = quantiles(wanted, group, counts[group], QUARTILES)
+    return percentiles, type_quartiles
+
+
+def compute_statistics(file_path):
+    """Compute column and per-type statistics in passes over the stored file, one batch at a time.
+
+    Returns a dict with 'columns' (min/max/mean/std/p50/p95/p99 per
+    numeric column), 'types' (row count plus mean and std of each
+    numeric column per equipment type), 'aggregates' (count, sum,
+    sum of squares, min and max of each numeric column per type, keyed
+    like the EquipmentTypeDistribution fields) and 'quartiles' ([q1, q3]
+    of each numeric column per type).
+    """
+    counts, moments = type_moments(file_path)
+    columns = {column: Moments() for column in NUMERIC_COLUMNS}
+    for by_column in moments.values():
+        for column in NUMERIC_COLUMNS:
+            columns[column].merge(by_column[column])
+    types = sorted(eq_type for eq_type in moments if eq_type is not None)
+    percentiles, quartiles = compute_quantiles(file_path, types, columns, moments)
+
+    column_statistics = {}
+    for column in NUMERIC_COLUMNS:
+        values = columns[column]
+        p50, p95, p99 = percentiles[column]
+        column_statistics[column] = {
+            'count': values.count,
+            'min_value': values.minimum,
+            'max_value': values.maximum,
+            'mean': values.average(),
+            'std': values.std(),
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+        }
+
+    type_statistics = {}
+    aggregates = {}
+    for eq_type in types:
+        by_column = moments[eq_type]
+        type_statistics[eq_type] = {
+            'count': counts[eq_type],
+            **{f'mean_{column.lower()}': by_column[column].average() for column in NUMERIC_COLUMNS},
+            **{f'std_{column.lower()}': by_column[column].std() for column in NUMERIC_COLUMNS},
+        }
+        aggregates[eq_type] = {}
+        for column in NUMERIC_COLUMNS:
+            metric = column.lower()
+            aggregates[eq_type].update({
+                f'{metric}_count': by_column[column].count,
+                f'{metric}_sum': by_column[column].total,
+                f'{metric}_sumsq': by_column[column].squares,
+                f'{metric}_min': by_column[column].minimum,
+                f'{metric}_max': by_column[column].maximum,
+            })
+
+    return {'columns': column_statistics, 'types': type_statistics, 'aggregates': aggregates,
+            'quartiles': quartiles}
+
+
+def save_statistics(dataset, statistics):
+    """Persist the output of compute_statistics for a dataset"""
+    ColumnStatistics.objects.bulk_create([
+        ColumnStatistics(dataset=dataset, column=column, **values)
+        for column, values in statistics['columns'].items()
+    ])
+    TypeStatistics.objects.bulk_create([
+        TypeStatistics(dataset=dataset, equipment_type=eq_type, **values)
+        for eq_type, values in statistics['types'].items()
+    ])
+
+
+def datasets_missing_statistics():
+    """Datasets without column statistics, or with a type distribution that has no per-reading aggregates"""
+    no_aggregates = Q(type_distributions__count__gt=0, **{
+        f'type_distributions__{column.lower()}_count': 0 for column in NUMERIC_COLUMNS
+    })
+    return EquipmentDataset.objects.filter(Q(column_statistics__isnull=True) | no_aggregates).distinct()
+
+
+def backfill_statistics(dataset, file_path):
+    """Recompute and replace a dataset's statistics and per-type aggregates from its stored file"""
+    statistics = compute_statistics(file_path)
+    with transaction.atomic():
+        ColumnStatistics.objects.filter(dataset=dataset).delete()
+        TypeStatistics.objects.filter(dataset=dataset).delete()
+        save_statistics(dataset, statistics)
+        distributions = list(EquipmentTypeDistribution.objects.filter(dataset=dataset))
+        for distribution in distributions:
+            for field, value in statistics['aggregates'].get(distribution.equipment_type, {}).items():
+                setattr(distribution, field, value)
+        EquipmentTypeDistribution.objects.bulk_update(distributions, AGGREGATE_FIELDS)
@@ -0,0 +1,124 @@
+"""Columnar on-disk storage for uploaded datasets.
+
+Datasets are stored as uncompressed Arrow IPC files, one record batch per
+ingested chunk. Reads memory-map the file so columns are used in place
+without any text parsing or copying. Datasets uploaded before the switch
+are still plain CSV files and are read through pyarrow's CSV reader.
+"""
+import glob
+import io
+import os
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+DATASET_EXTENSION = '.arrow'
+
+
+def is_legacy_csv(file_path):
+    return file_path.endswith('.csv')
+
+
+def schema_for(columns):
+    """Typed schema for a dataset: float64 for the numeric readings, strings otherwise"""
+    return pa.schema([
+        pa.field(column, pa.float64() if column in NUMERIC_COLUMNS else pa.string())
+        for column in columns
+    ])
+
+
+class DatasetWriter:
+    """Append pandas chunks to an Arrow IPC file as record batches"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.sink = None
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk):
+        if self.writer is None:
+            self.schema = schema_for(chunk.columns)
+            self.sink = pa.OSFile(self.file_path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+        table = pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def remove_dataset_files(file_path):
+    """Delete a stored dataset together with any index files derived from it"""
+    for path in [file_path] + glob.glob(f'{glob.escape(file_path)}.*'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def open_table(file_path, columns=None):
+    """Load a stored dataset as a pyarrow Table, optionally projected to columns.
+
+    Arrow files are memory-mapped, so the returned table references the
+    file pages directly instead of copying them onto the heap.
+    """
+    if is_legacy_csv(file_path):
+        read_options = pa_csv.ConvertOptions(include_columns=columns) if columns else None
+        return pa_csv.read_csv(file_path, convert_options=read_options)
+    source = pa.memory_map(file_path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if columns:
+        table = table.select(columns)
+    return table
+
+
+def iter_batches(file_path, columns=None):
+    """Yield a stored dataset one record batch at a time, optionally projected to columns.
+
+    Unlike open_table the file is read rather than memory-mapped, so a
+    pass over every row holds only the current batch in memory.
+    """
+    if is_legacy_csv(file_path):
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={field.name: field.type for field in schema_for(REQUIRED_COLUMNS)},
+        )
+        with pa_csv.open_csv(file_path, convert_options=convert_options) as reader:
+            yield from reader
+        return
+
+    with pa.OSFile(file_path, 'rb') as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            yield batch.select(columns) if columns else batch
+
+
+def iter_csv(file_path, block_size=1024 * 1024):
+    """Yield a stored dataset as CSV bytes, one record batch at a time"""
+    if is_legacy_csv(file_path):
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    return
+                yield block
+
+    source = pa.memory_map(file_path, 'r')
+    reader = pa.ipc.open_file(source)
+    for index in range(reader.num_record_batches):
+        buffer = io.BytesIO()
+        write_options = pa_csv.WriteOptions(include_header=index == 0)
+        pa_csv.write_csv(reader.get_batch(index), buffer, write_options=write_options)
+        yield buffer.getvalue()
@@ -0,0 +1,214 @@
+"""Tests for the equipment API, run with `python manage.py test equipment`"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import (ColumnStatistics, EquipmentDataset, EquipmentTypeDistribution, TypeStatistics, UploadChunk,
+                     UploadSession)
+from .retention import sweep_retention
+from .stats import AGGREGATE_FIELDS, datasets_missing_statistics
+from .uploads import chunk_path, session_dir
+
+
+class EquipmentTestCase(TestCase):
+    """Authenticated API client, an in-process cache and a throwaway MEDIA_ROOT per test class"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        # Background threads would contend for the test database
+        cls.test_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            REPORT_PRERENDER=False,
+            DATASET_RETENTION={**settings.DATASET_RETENTION, 'SWEEP_ON_UPLOAD': False},
+        )
+        cls.test_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.test_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('tester', password='tester')
+        self.client.force_authenticate(self.user)
+
+
+def create_datasets(count, types=3):
+    """File-less datasets, one minute apart and newest last, with `types` distribution rows each"""
+    start = timezone.now() - timedelta(minutes=count)
+    datasets = EquipmentDataset.objects.bulk_create([
+        EquipmentDataset(name=f'seed_{i}.csv', uploaded_at=start + timedelta(minutes=i), file_path='',
+                         storage_tier=EquipmentDataset.TIER_ARCHIVED, total_count=10 * types)
+        for i in range(count)
+    ])
+    EquipmentTypeDistribution.objects.bulk_create([
+        EquipmentTypeDistribution(dataset=dataset, equipment_type=f'Type-{t}', count=10)
+        for dataset in datasets
+        for t in range(types)
+    ])
+    return datasets
+
+
+class HistoryQueryCountTests(EquipmentTestCase):
+    """A history page costs the same queries whatever its size: datasets, then their distributions"""
+    PAGE_SIZES = [1, 5, 20, 100]
+
+    def setUp(self):
+        super().setUp()
+        create_datasets(120)
+        # The first request of a process also resumes ingestion jobs
+        self.client.get('/api/history/')
+
+    def assert_page_queries(self, include, queries):
+        for size in self.PAGE_SIZES:
+            with self.subTest(include_distributions=include, limit=size):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    response = self.client.get(f'/api/history/?limit={size}&include_distributions={include}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), size)
+
+    def test_with_distributions(self):
+        self.assert_page_queries('true', 2)
+
+    def test_without_distributions(self):
+        self.assert_page_queries('false', 1)
+
+    def test_later_pages(self):
+        response = self.client.get('/api/history/?limit=20')
+        for _ in range(3):
+            cache.clear()
+            with self.assertNumQueries(2):
+                response = self.client.get(response.json()['next'])
+            self.assertEqual(len(response.json()['results']), 20)
+
+    def test_distributions_are_included(self):
+        results = self.client.get('/api/history/?limit=5').json()['results']
+        self.assertEqual(results[0]['name'], 'seed_119.csv')
+        self.assertEqual(len(results[0]['type_distributions']), 3)
+        results = self.client.get('/api/history/?limit=5&include_distributions=false').json()['results']
+        self.assertNotIn('type_distributions', results[0])
+
+
+class UploadSessionExpiryTests(EquipmentTestCase):
+    """The retention sweep deletes stale upload sessions with their parts, finalized or not"""
+    CSV = b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP-1,Pump,120,5.2,80\n'
+
+    def start_session(self):
+        session = self.client.post('/api/uploads/', {'name': 'plant.csv', 'size': len(self.CSV)}, format='json').json()
+        response = self.client.put(f"/api/uploads/{session['id']}/chunks/0/", self.CSV,
+                                   content_type='application/octet-stream',
+                                   HTTP_X_CHUNK_SHA256=hashlib.sha256(self.CSV).hexdigest())
+        self.assertEqual(response.status_code, 200)
+        return UploadSession.objects.get(id=session['id'])
+
+    def test_stale_sessions_expire(self):
+        stale, fresh = self.start_session(), self.start_session()
+        UploadSession.objects.filter(id=stale.id).update(created_at=timezone.now() - timedelta(hours=49))
+
+        self.assertEqual(sweep_retention()['sessions_expired'], 1)
+        self.assertFalse(UploadSession.objects.filter(id=stale.id).exists())
+        self.assertFalse(UploadChunk.objects.filter(session_id=stale.id).exists())
+        self.assertFalse(os.path.exists(session_dir(stale)))
+        self.assertTrue(os.path.exists(chunk_path(fresh, 0)))
+        self.assertEqual(self.client.get(f'/api/uploads/{stale.id}/').status_code, 404)
+
+    def test_expiry_can_be_disabled(self):
+        stale = self.start_session()
+        UploadSession.objects.filter(id=stale.id).update(created_at=timezone.now() - timedelta(days=30))
+        with override_settings(DATASET_RETENTION={**settings.DATASET_RETENTION, 'UPLOAD_SESSION_HOURS': None}):
+            self.assertEqual(sweep_retention()['sessions_expired'], 0)
+        self.assertTrue(os.path.exists(chunk_path(stale, 0)))
+
+
+def equipment_csv(rows, types=3):
+    lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+    lines += [f'EQ-{i:04d},Type-{i % types},{100 + i},{1 + i % 7},{20 + i % 13}' for i in range(rows)]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+class DatasetRowsTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/upload/', {'file': SimpleUploadedFile('plant.csv', equipment_csv(25))},
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.url = f"/api/dataset/{response.json()['dataset']['id']}/"
+
+    def test_default_page_size(self):
+        with mock.patch('equipment.queries.DEFAULT_PAGE_SIZE', 10):
+            page = self.client.get(self.url).json()
+        self.assertEqual(len(page['data']), 10)
+        self.assertEqual(page['total'], 25)
+        self.assertEqual(page['next_offset'], 10)
+
+    def test_pages_cover_every_row(self):
+        names = []
+        offset = 0
+        while offset is not None:
+            page = self.client.get(self.url, {'offset': offset, 'limit': 10}).json()
+            names += [row['Equipment Name'] for row in page['data']]
+            offset = page['next_offset']
+        self.assertEqual(names, [f'EQ-{i:04d}' for i in range(25)])
+
+    def test_limit_is_at_least_one(self):
+        response = self.client.get(self.url, {'limit': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limit', response.json()['error'])
+
+
+class BackfillStatisticsTests(EquipmentTestCase):
+    """Datasets uploaded before statistics and aggregates were recorded get them from their stored file"""
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/upload/', {'file': SimpleUploadedFile('plant.csv', equipment_csv(40))},
+                                    format='multipart')
+        self.dataset = EquipmentDataset.objects.get(id=response.json()['dataset']['id'])
+
+    def snapshot(self):
+        return (
+            list(ColumnStatistics.objects.filter(dataset=self.dataset).order_by('column')
+                 .values('column', 'count', 'mean', 'std', 'p50', 'p95', 'p99')),
+            list(TypeStatistics.objects.filter(dataset=self.dataset).order_by('equipment_type')
+                 .values('equipment_type', 'count', 'mean_flowrate', 'std_pressure')),
+            list(EquipmentTypeDistribution.objects.filter(dataset=self.dataset).order_by('equipment_type')
+                 .values('equipment_type', 'count', *AGGREGATE_FIELDS)),
+        )
+
+    def test_backfill(self):
+        uploaded = self.snapshot()
+        # As left by migrations 0002 and 0009 for an earlier upload
+        ColumnStatistics.objects.filter(dataset=self.dataset).delete()
+        TypeStatistics.objects.filter(dataset=self.dataset).delete()
+        EquipmentTypeDistribution.objects.filter(dataset=self.dataset).update(
+            **{field: 0 if field.endswith(('_count', '_sum', '_sumsq')) else None for field in AGGREGATE_FIELDS}
+        )
+        self.assertEqual(list(datasets_missing_statistics()), [self.dataset])
+
+        call_command('backfill_statistics', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), uploaded)
+        self.assertEqual(list(datasets_missing_statistics()), [])
+
+    def test_recompute_all(self):
+        uploaded = self.snapshot()
+        call_command('backfill_statistics', '--all', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), uploaded)
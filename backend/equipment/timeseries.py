@@ -0,0 +1,93 @@
+"""Per-equipment time series built from successive uploads.
+
+Every upload appends one EquipmentReading per row, stamped with the
+upload time, once the dataset itself has committed. Range queries go
+through the (equipment_name, recorded_at) index, and hourly or daily
+rollups are computed by the database with GROUP BY over truncated
+timestamps, so no dataset file is ever scanned. Readings older than
+DATASET_RETENTION['READINGS_DAYS'] are pruned by the retention sweep.
+"""
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import EquipmentReading
+from .storage import NUMERIC_COLUMNS, iter_batches
+
+
+BUCKETS = {
+    'hour': TruncHour,
+    'day': TruncDay,
+}
+METRICS = [column.lower() for column in NUMERIC_COLUMNS]
+# Readings written per transaction, so other writers never wait long for the database
+READINGS_BATCH_SIZE = 10000
+
+
+def store_readings(dataset, file_path):
+    """Append a reading for every row of a stored dataset in committed batches.
+
+    Call it outside any transaction: each READINGS_BATCH_SIZE rows commit
+    on their own, and the file is read one record batch at a time. Rows
+    go straight to cursor.executemany: building a model instance per
+    reading made bulk_create spend about 90% of its time in the ORM.
+    """
+    meta = EquipmentReading._meta
+    columns = ['dataset_id', 'equipment_name', 'equipment_type', 'recorded_at'] + METRICS
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(meta.db_table),
+        ', '.join(connection.ops.quote_name(meta.get_field(column).column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    recorded_at = connection.ops.adapt_datetimefield_value(dataset.uploaded_at)
+    for batch in iter_batches(file_path, columns=['Equipment Name', 'Type'] + NUMERIC_COLUMNS):
+        for offset in range(0, batch.num_rows, READINGS_BATCH_SIZE):
+            values = batch.slice(offset, READINGS_BATCH_SIZE).to_pydict()
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, [
+                    (dataset.id, name, eq_type or '', recorded_at, flowrate, pressure, temperature)
+                    for name, eq_type, flowrate, pressure, temperature in zip(
+                        values['Equipment Name'], values['Type'],
+                        *(values[column] for column in NUMERIC_COLUMNS)
+                    )
+                    if name is not None
+                ])
+
+
+def prune_readings(days):
+    """Delete readings recorded more than `days` days ago, a committed batch at a time; returns how many"""
+    stale = EquipmentReading.objects.filter(recorded_at__lt=timezone.now() - timedelta(days=days))
+    deleted = 0
+    while True:
+        ids = list(stale.order_by('id').values_list('id', flat=True)[:READINGS_BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += stale.filter(id__gte=ids[0], id__lte=ids[-1]).delete()[0]
+
+
+def equipment_series(equipment_name, days, bucket=None):
+    """Readings of one equipment over the last `days` days, oldest first.
+
+    Without a bucket every reading is returned; with bucket='hour' or
+    'day' readings are rolled up into min/max/mean per bucket.
+    """
+    readings = EquipmentReading.objects.filter(
+        equipment_name=equipment_name,
+        recorded_at__gte=timezone.now() - timedelta(days=days),
+    )
+    if not bucket:
+        return list(readings.order_by('recorded_at').values('recorded_at', 'dataset', *METRICS))
+
+    aggregates = {'count': Count('id')}
+    for metric in METRICS:
+        aggregates[f'{metric}_min'] = Min(metric)
+        aggregates[f'{metric}_max'] = Max(metric)
+        aggregates[f'{metric}_mean'] = Avg(metric)
+    return list(
+        readings.annotate(bucket=BUCKETS[bucket]('recorded_at'))
+        .values('bucket')
+        .annotate(**aggregates)
+        .order_by('bucket')
+    )
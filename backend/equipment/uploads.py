@@ -0,0 +1,97 @@
+"""On-disk storage for resumable chunked uploads.
+
+Each verified chunk is written to MEDIA_ROOT/chunks/<session id>/<index>.part.
+Finalizing concatenates the parts, in order, into a staged CSV that the
+background ingestion job picks up, hashing the whole file as it goes.
+Sessions that are never finalized are expired by the retention sweep.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UploadSession
+
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+
+
+def session_dir(session):
+    return os.path.join(settings.MEDIA_ROOT, 'chunks', str(session.id))
+
+
+def chunk_path(session, index):
+    return os.path.join(session_dir(session), f'{index}.part')
+
+
+def write_chunk(session, index, stream, checksum):
+    """Stream one chunk body to disk, verifying its size and SHA-256.
+
+    The part only becomes visible once it is complete and verified, so a
+    retried or concurrent PUT of the same chunk never leaves a torn file.
+    Raises ValueError if the body does not match.
+    """
+    expected_size = session.expected_chunk_size(index)
+    os.makedirs(session_dir(session), exist_ok=True)
+    tmp_path = f'{chunk_path(session, index)}.{uuid.uuid4().hex}.tmp'
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as destination:
+            while size <= expected_size:
+                block = stream.read(BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                destination.write(block)
+                size += len(block)
+        if size != expected_size:
+            raise ValueError(f'Chunk {index} should be {expected_size} bytes, received {size}')
+        if digest.hexdigest() != checksum.lower():
+            raise ValueError(f'Checksum mismatch for chunk {index}')
+        os.replace(tmp_path, chunk_path(session, index))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size
+
+
+def assemble(session):
+    """Concatenate all parts into a staged CSV under MEDIA_ROOT/incoming.
+
+    Returns (staged path, SHA-256 hex digest of the whole file).
+    """
+    incoming_dir = os.path.join(settings.MEDIA_ROOT, 'incoming')
+    os.makedirs(incoming_dir, exist_ok=True)
+    upload_path = os.path.join(incoming_dir, f'{uuid.uuid4().hex}.csv')
+    digest = hashlib.sha256()
+    with open(upload_path, 'wb') as destination:
+        for index in range(session.total_chunks):
+            with open(chunk_path(session, index), 'rb') as part:
+                while True:
+                    block = part.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    destination.write(block)
+    discard(session)
+    return upload_path, digest.hexdigest()
+
+
+def discard(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def expire_sessions(hours):
+    """Delete upload sessions started more than `hours` ago, with their chunks and parts; returns how many"""
+    stale = UploadSession.objects.filter(created_at__lt=timezone.now() - timedelta(hours=hours))
+    sessions = list(stale.only('id'))
+    stale.delete()
+    for session in sessions:
+        discard(session)
+    return len(sessions)
@@ -3,9 +3,20 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_csv, name='upload_csv'),
+    path('uploads/', views.create_upload_session, name='create_upload_session'),
+    path('uploads/<uuid:session_id>/', views.get_upload_session, name='get_upload_session'),
+    path('uploads/<uuid:session_id>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:session_id>/finalize/', views.finalize_upload, name='finalize_upload'),
+    path('jobs/<uuid:job_id>/', views.get_job_status, name='get_job_status'),
     path('summary/', views.get_summary, name='get_summary'),
     path('summary/<int:dataset_id>/', views.get_summary, name='get_summary_by_id'),
     path('history/', views.get_history, name='get_history'),
+    path('compare/', views.compare, name='compare'),
+    path('trends/', views.get_trends, name='get_trends'),
+    path('aggregates/', views.get_aggregates, name='get_aggregates'),
+    path('timeseries/', views.get_timeseries, name='get_timeseries'),
     path('dataset/<int:dataset_id>/', views.get_dataset_data, name='get_dataset_data'),
+    path('dataset/<int:dataset_id>/anomalies/', views.get_dataset_anomalies, name='get_dataset_anomalies'),
+    path('dataset/<int:dataset_id>/csv/', views.export_dataset_csv, name='export_dataset_csv'),
     path('report/<int:dataset_id>/', views.generate_pdf_report, name='generate_pdf_report'),
 ]
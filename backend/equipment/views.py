@@ -1,19 +1,34 @@
 import os
-import pandas as pd
-from django.http import HttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import EquipmentDataset, EquipmentTypeDistribution
-from .serializers import EquipmentDatasetSerializer, DataSummarySerializer
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from datetime import datetime
+from rest_framework.settings import api_settings
+from .models import AnomalousReading, EquipmentDataset, IngestionJob, UploadSession, UploadChunk
+from .serializers import (EquipmentDatasetSerializer, DatasetHistorySerializer, DataSummarySerializer,
+                          ColumnStatisticsSerializer, TypeStatisticsSerializer,
+                          AnomalousReadingSerializer, IngestionJobSerializer, UploadSessionSerializer)
+from .storage import iter_csv
+from .queries import MAX_PAGE_SIZE, parse_int, query_rows
+from .renderers import ORJSONRenderer, ColumnarJSONRenderer, accepts_tables
+from .compare import DEFAULT_DIFF_LIMIT, compare_datasets, dataset_trends
+from .timeseries import BUCKETS, equipment_series
+from .aggregates import type_aggregates
+from .pipeline import DuplicateUpload, create_dataset, find_duplicate, upload_digest
+from .jobs import stage_upload, enqueue_upload
+from .cache import cached_response, dataset_rows_etag, etag_matches
+from .reports import render_report
+from .retention import local_file_path
+from .uploads import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, write_chunk, assemble
+
+
+# Opt in with ?format=orjson or ?format=columnar on endpoints returning many rows
+LARGE_RESPONSE_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES + [ORJSONRenderer, ColumnarJSONRenderer]
 
 
 @api_view(['POST'])
@@ -29,90 +44,190 @@ def upload_csv(request):
     if not file.name.endswith('.csv'):
         return Response({'error': 'File must be a CSV'}, status=status.HTTP_400_BAD_REQUEST)
     
+    # Large files (or async=true) are parsed in the background
+    run_async = request.data.get('async', request.query_params.get('async', '')).lower() in ('1', 'true', 'yes')
+    if run_async or file.size >= settings.INGEST_ASYNC_THRESHOLD:
+        upload_path, content_hash = stage_upload(file)
+        job = enqueue_upload(upload_path, file.name, user=request.user, content_hash=content_hash)
+        return job_accepted_response(job)
+    
+    # A byte-identical file was already ingested: return that dataset as is
+    content_hash = upload_digest(file)
+    duplicate = find_duplicate(content_hash)
+    if duplicate:
+        return duplicate_response(duplicate)
+    
     try:
-        # Read CSV file
-        df = pd.read_csv(file)
-        
-        # Validate required columns
-        required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            return Response({
-                'error': f'Missing required columns: {", ".join(missing_columns)}'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Calculate statistics
-        total_count = len(df)
-        avg_flowrate = df['Flowrate'].mean()
-        avg_pressure = df['Pressure'].mean()
-        avg_temperature = df['Temperature'].mean()
-        
-        # Calculate equipment type distribution
-        type_distribution = df['Type'].value_counts().to_dict()
-        
-        # Save file to media directory
-        media_dir = os.path.join(settings.MEDIA_ROOT, 'uploads')
-        os.makedirs(media_dir, exist_ok=True)
-        
-        file_path = os.path.join(media_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.name}")
-        df.to_csv(file_path, index=False)
+        dataset, aggregates = create_dataset(file, file.name, content_hash=content_hash)
+        return upload_response(dataset, aggregates.type_distribution())
         
-        # Create dataset record
-        dataset = EquipmentDataset.objects.create(
-            name=file.name,
-            file_path=file_path,
-            total_count=total_count,
-            avg_flowrate=avg_flowrate,
-            avg_pressure=avg_pressure,
-            avg_temperature=avg_temperature
-        )
-        
-        # Create type distribution records
-        for eq_type, count in type_distribution.items():
-            EquipmentTypeDistribution.objects.create(
-                dataset=dataset,
-                equipment_type=eq_type,
-                count=count
-            )
+    except DuplicateUpload as e:
+        return duplicate_response(e.dataset)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def duplicate_response(dataset):
+    type_distribution = {dist.equipment_type: dist.count for dist in dataset.type_distributions.all()}
+    return upload_response(dataset, type_distribution, duplicate=True)
+
+
+def upload_response(dataset, type_distribution, duplicate=False):
+    serializer = EquipmentDatasetSerializer(dataset)
+    return Response({
+        'message': 'File already uploaded' if duplicate else 'File uploaded successfully',
+        'duplicate': duplicate,
+        'dataset': serializer.data,
+        'summary': {
+            'dataset_id': dataset.id,
+            'total_count': dataset.total_count,
+            'avg_flowrate': round(dataset.avg_flowrate, 2) if dataset.avg_flowrate else 0,
+            'avg_pressure': round(dataset.avg_pressure, 2) if dataset.avg_pressure else 0,
+            'avg_temperature': round(dataset.avg_temperature, 2) if dataset.avg_temperature else 0,
+            'equipment_type_distribution': type_distribution
+        }
+    }, status=status.HTTP_200_OK if duplicate else status.HTTP_201_CREATED)
+
+
+def job_accepted_response(job):
+    return Response({
+        'message': 'File already uploaded' if job.duplicate else 'File accepted for processing',
+        'job_id': str(job.id),
+        'status': job.status,
+        'duplicate': job.duplicate,
+        'status_url': reverse('get_job_status', args=[job.id]),
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request):
+    """Start a resumable upload that is sent as separately checksummed chunks"""
+    name = request.data.get('name', '')
+    if not name.endswith('.csv'):
+        return Response({'error': 'File must be a CSV'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        total_size = int(request.data.get('size'))
+        chunk_size = int(request.data.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        return Response({'error': 'size and chunk_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if total_size <= 0 or not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        return Response({'error': f'size must be positive and chunk_size at most {MAX_CHUNK_SIZE}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    session = UploadSession.objects.create(
+        name=name,
+        total_size=total_size,
+        chunk_size=chunk_size,
+        created_by=request.user,
+    )
+    serializer = UploadSessionSerializer(session)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_upload_session(request, session_id):
+    """Get a chunked upload's state, including which chunks were already received"""
+    try:
+        session = UploadSession.objects.get(id=session_id, created_by=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = UploadSessionSerializer(session)
+    return Response(serializer.data)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, session_id, index):
+    """Store chunk `index` of a chunked upload; the body is raw bytes, checksummed by X-Chunk-SHA256"""
+    try:
+        session = UploadSession.objects.get(id=session_id, created_by=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if session.job_id:
+        return Response({'error': 'Upload already finalized'}, status=status.HTTP_409_CONFLICT)
+    if index >= session.total_chunks:
+        return Response({'error': f'Chunk index must be below {session.total_chunks}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    checksum = request.headers.get('X-Chunk-SHA256')
+    if not checksum:
+        return Response({'error': 'X-Chunk-SHA256 header is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        size = write_chunk(session, index, request, checksum)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    UploadChunk.objects.update_or_create(
+        session=session, index=index,
+        defaults={'size': size, 'checksum': checksum.lower()},
+    )
+    return Response({'index': index, 'size': size})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finalize_upload(request, session_id):
+    """Assemble a fully received chunked upload and queue it for ingestion"""
+    with transaction.atomic():
+        try:
+            session = UploadSession.objects.select_for_update().get(id=session_id, created_by=request.user)
+        except UploadSession.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Keep only last 5 datasets
-        datasets = EquipmentDataset.objects.all().order_by('-uploaded_at')
-        if datasets.count() > 5:
-            for old_dataset in datasets[5:]:
-                # Delete associated file
-                if os.path.exists(old_dataset.file_path):
-                    os.remove(old_dataset.file_path)
-                old_dataset.delete()
+        # Finalizing twice returns the job created the first time
+        if session.job:
+            return job_accepted_response(session.job)
         
-        # Return summary
-        serializer = EquipmentDatasetSerializer(dataset)
-        return Response({
-            'message': 'File uploaded successfully',
-            'dataset': serializer.data,
-            'summary': {
-                'total_count': total_count,
-                'avg_flowrate': round(avg_flowrate, 2),
-                'avg_pressure': round(avg_pressure, 2),
-                'avg_temperature': round(avg_temperature, 2),
-                'equipment_type_distribution': type_distribution
-            }
-        }, status=status.HTTP_201_CREATED)
+        received = set(session.chunks.values_list('index', flat=True))
+        missing = [index for index in range(session.total_chunks) if index not in received]
+        if missing:
+            return Response({'error': 'Upload is incomplete', 'missing': missing},
+                            status=status.HTTP_400_BAD_REQUEST)
         
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        upload_path, content_hash = assemble(session)
+        job = enqueue_upload(upload_path, session.name, user=request.user, content_hash=content_hash)
+        session.job = job
+        session.save(update_fields=['job'])
+    return job_accepted_response(job)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_job_status(request, job_id):
+    """Get progress of a background ingestion job"""
+    try:
+        job = IngestionJob.objects.get(id=job_id, created_by=request.user)
+    except IngestionJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = IngestionJobSerializer(job)
+    return Response(serializer.data)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_summary(request, dataset_id=None):
     """Get summary statistics for a specific dataset or latest dataset"""
+    return cached_response(request, 'summary', dataset_id or 'latest', lambda: summary_response(dataset_id))
+
+
+def summary_response(dataset_id):
+    # Statistics are precomputed at upload, so the raw file is never read here
+    datasets = EquipmentDataset.objects.prefetch_related(
+        'type_distributions', 'column_statistics', 'type_statistics'
+    )
     if dataset_id:
         try:
-            dataset = EquipmentDataset.objects.get(id=dataset_id)
+            dataset = datasets.get(id=dataset_id)
         except EquipmentDataset.DoesNotExist:
             return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
     else:
-        dataset = EquipmentDataset.objects.first()
+        dataset = datasets.first()
         if not dataset:
             return Response({'error': 'No datasets available'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -121,11 +236,20 @@ def get_summary(request, dataset_id=None):
     type_dist_dict = {dist.equipment_type: dist.count for dist in type_distributions}
     
     summary = {
+        'dataset_id': dataset.id,
         'total_count': dataset.total_count,
         'avg_flowrate': round(dataset.avg_flowrate, 2) if dataset.avg_flowrate else 0,
         'avg_pressure': round(dataset.avg_pressure, 2) if dataset.avg_pressure else 0,
         'avg_temperature': round(dataset.avg_temperature, 2) if dataset.avg_temperature else 0,
-        'equipment_type_distribution': type_dist_dict
+        'equipment_type_distribution': type_dist_dict,
+        'statistics': {
+            stats.column: ColumnStatisticsSerializer(stats).data
+            for stats in dataset.column_statistics.all()
+        },
+        'type_statistics': {
+            stats.equipment_type: TypeStatisticsSerializer(stats).data
+            for stats in dataset.type_statistics.all()
+        },
     }
     
     serializer = DataSummarySerializer(summary)
@@ -134,104 +258,219 @@ def get_summary(request, dataset_id=None):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(LARGE_RESPONSE_RENDERERS)
 def get_history(request):
-    """Get history of last 5 uploaded datasets"""
-    datasets = EquipmentDataset.objects.all().order_by('-uploaded_at')[:5]
-    serializer = EquipmentDatasetSerializer(datasets, many=True)
-    return Response(serializer.data)
+    """Get uploaded datasets, newest first, a cursor-paginated page at a time"""
+    include_distributions = request.query_params.get('include_distributions', 'true').lower() in ('1', 'true', 'yes')
+    # Page links are absolute, so the full URL is the key
+    return cached_response(request, 'history', request.build_absolute_uri(),
+                           lambda: history_response(request, include_distributions))
+
+
+class HistoryPagination(CursorPagination):
+    page_size = 5
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = '-uploaded_at'
+
+
+def history_response(request, include_distributions=True):
+    """One page of history in two queries however long the page: datasets, then their distributions"""
+    datasets = EquipmentDataset.objects.all()
+    if include_distributions:
+        datasets = datasets.prefetch_related('type_distributions')
+    paginator = HistoryPagination()
+    page = paginator.paginate_queryset(datasets, request)
+    serializer_class = EquipmentDatasetSerializer if include_distributions else DatasetHistorySerializer
+    return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+
+MAX_TREND_POINTS = 100
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def compare(request):
+    """Compare datasets given as ids=a,b[,c...]; each dataset is diffed against the one before it"""
+    try:
+        ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        limit = min(parse_int(request.query_params, 'limit', default=DEFAULT_DIFF_LIMIT), MAX_PAGE_SIZE)
+        tolerance = float(request.query_params.get('tolerance', 0))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) < 2:
+        return Response({'error': 'ids must list at least two dataset ids'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    key = f'{",".join(map(str, ids))}:{limit}:{tolerance}'
+    return cached_response(request, 'compare', key, lambda: compare_response(ids, limit, tolerance))
+
+
+def compare_response(ids, limit, tolerance):
+    datasets = EquipmentDataset.objects.prefetch_related('type_statistics').in_bulk(ids)
+    missing = [dataset_id for dataset_id in ids if dataset_id not in datasets]
+    if missing:
+        return Response({'error': f'Datasets not found: {", ".join(map(str, missing))}'},
+                        status=status.HTTP_404_NOT_FOUND)
+    if not all(os.path.exists(local_file_path(dataset)) for dataset in datasets.values()):
+        return Response({'error': 'Dataset file not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    comparisons = [
+        compare_datasets(datasets[base_id], datasets[other_id], limit=limit, tolerance=tolerance)
+        for base_id, other_id in zip(ids, ids[1:])
+    ]
+    return Response({'comparisons': comparisons})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_trends(request):
+    """Get totals and per-type statistics of recent datasets, oldest first, with deltas between uploads"""
+    try:
+        limit = min(parse_int(request.query_params, 'limit', default=10, minimum=2), MAX_TREND_POINTS)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return cached_response(request, 'trends', limit, lambda: trends_response(limit))
+
+
+def trends_response(limit):
+    datasets = EquipmentDataset.objects.prefetch_related('type_statistics').order_by('-uploaded_at')[:limit]
+    return Response({'trends': dataset_trends(reversed(list(datasets)))})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_timeseries(request):
+    """Get one equipment's readings across uploads, optionally rolled up by hour or day"""
+    equipment = request.query_params.get('equipment')
+    if not equipment:
+        return Response({'error': 'equipment is required'}, status=status.HTTP_400_BAD_REQUEST)
+    bucket = request.query_params.get('bucket') or None
+    if bucket and bucket not in BUCKETS:
+        return Response({'error': f'bucket must be one of: {", ".join(BUCKETS)}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        days = parse_int(request.query_params, 'days', default=90, minimum=1)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    key = f'{equipment}:{days}:{bucket}'
+    return cached_response(request, 'timeseries', key, lambda: Response({
+        'equipment': equipment,
+        'days': days,
+        'bucket': bucket,
+        'points': equipment_series(equipment, days, bucket),
+    }))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_aggregates(request):
+    """Get per-type reading aggregates across datasets, computed with one GROUP BY query"""
+    key = request.query_params.urlencode()
+    
+    def build():
+        try:
+            return Response({'results': type_aggregates(request.query_params)})
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return cached_response(request, 'aggregates', key, build)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(LARGE_RESPONSE_RENDERERS)
 def get_dataset_data(request, dataset_id):
-    """Get full data for a specific dataset"""
+    """Get dataset rows, with optional pagination, field projection and sorting"""
     try:
         dataset = EquipmentDataset.objects.get(id=dataset_id)
     except EquipmentDataset.DoesNotExist:
         return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if not os.path.exists(dataset.file_path):
+    # Checked before the file is touched, so revalidating never rehydrates an archive
+    headers = {'ETag': dataset_rows_etag(dataset, request.query_params), 'Cache-Control': 'private, no-cache'}
+    if etag_matches(request, headers['ETag']):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    file_path = local_file_path(dataset)
+    if not os.path.exists(file_path):
         return Response({'error': 'Dataset file not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
-        df = pd.read_csv(dataset.file_path)
-        data = df.to_dict('records')
-        return Response({'data': data})
+        return Response(query_rows(file_path, request.query_params, as_table=accepts_tables(request)),
+                        headers=headers)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def generate_pdf_report(request, dataset_id):
-    """Generate PDF report for a dataset"""
+def get_dataset_anomalies(request, dataset_id):
+    """Get readings flagged as outliers at upload, most extreme first"""
+    if not EquipmentDataset.objects.filter(id=dataset_id).exists():
+        return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        offset = parse_int(request.query_params, 'offset', default=0)
+        limit = min(parse_int(request.query_params, 'limit', default=100, minimum=1), MAX_PAGE_SIZE)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    anomalies = AnomalousReading.objects.filter(dataset_id=dataset_id)
+    for param, field in (('metric', 'metric'), ('type', 'equipment_type'), ('equipment', 'equipment_name')):
+        if request.query_params.get(param):
+            anomalies = anomalies.filter(**{field: request.query_params[param]})
+    
+    total = anomalies.count()
+    page = anomalies[offset:offset + limit]
+    next_offset = offset + limit
+    return Response({
+        'data': AnomalousReadingSerializer(page, many=True).data,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'next_offset': next_offset if next_offset < total else None,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_dataset_csv(request, dataset_id):
+    """Stream a dataset back as CSV"""
     try:
         dataset = EquipmentDataset.objects.get(id=dataset_id)
     except EquipmentDataset.DoesNotExist:
         return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="equipment_report_{dataset_id}.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=letter)
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title = Paragraph(f"Chemical Equipment Report - {dataset.name}", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Summary information
-    story.append(Paragraph(f"<b>Upload Date:</b> {dataset.uploaded_at.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 0.1*inch))
-    
-    # Summary table
-    summary_data = [
-        ['Metric', 'Value'],
-        ['Total Equipment Count', str(dataset.total_count)],
-        ['Average Flowrate', f"{dataset.avg_flowrate:.2f}" if dataset.avg_flowrate else "N/A"],
-        ['Average Pressure', f"{dataset.avg_pressure:.2f}" if dataset.avg_pressure else "N/A"],
-        ['Average Temperature', f"{dataset.avg_temperature:.2f}" if dataset.avg_temperature else "N/A"],
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(summary_table)
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Equipment type distribution
-    story.append(Paragraph("<b>Equipment Type Distribution</b>", styles['Heading2']))
-    story.append(Spacer(1, 0.1*inch))
+    file_path = local_file_path(dataset)
+    if not os.path.exists(file_path):
+        return Response({'error': 'Dataset file not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    type_distributions = dataset.type_distributions.all()
-    if type_distributions:
-        dist_data = [['Equipment Type', 'Count']]
-        for dist in type_distributions:
-            dist_data.append([dist.equipment_type, str(dist.count)])
-        
-        dist_table = Table(dist_data, colWidths=[3*inch, 2*inch])
-        dist_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(dist_table)
-    
-    doc.build(story)
+    filename = f"{os.path.splitext(dataset.name)[0]}.csv"
+    response = StreamingHttpResponse(iter_csv(file_path), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def generate_pdf_report(request, dataset_id):
+    """Download the PDF report for a dataset, rendering it on first request"""
+    try:
+        dataset = EquipmentDataset.objects.get(id=dataset_id)
+    except EquipmentDataset.DoesNotExist:
+        return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        path = render_report(dataset)
+    except Exception as e:
+        return Response({'error': f'Report rendering failed: {e}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=f"equipment_report_{dataset_id}.pdf",
+        content_type='application/pdf',
+    )
@@ -0,0 +1,88 @@
+"""HTTP client shared by every worker thread of the desktop app.
+
+One requests.Session keeps a pool of keep-alive connections to the
+backend, so requests after the first skip the TCP/TLS handshake. Responses
+are gzip-compressed by the server and decoded transparently. Idempotent
+requests are retried with exponential backoff on read errors and
+502/503/504, and once on a refused connection. Identical GETs issued
+while one is already in flight wait for its response instead of going
+out again.
+"""
+import threading
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class APIClient:
+    POOL_SIZE = 10
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+
+    def __init__(self):
+        self.session = requests.Session()
+        retry = Retry(
+            total=self.RETRIES,
+            # A refused connection gets one immediate retry, so going offline is noticed at once
+            connect=1,
+            backoff_factor=self.BACKOFF_FACTOR,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def request(self, method, url, **kwargs):
+        if method == 'GET' and not kwargs.get('stream'):
+            return self.coalesced_get(url, **kwargs)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def coalesced_get(self, url, params=None, auth=None, headers=None, **kwargs):
+        """GET url, sharing the response of an identical request that is already in flight"""
+        key = (
+            url,
+            tuple(sorted((params or {}).items())),
+            (getattr(auth, 'username', None), getattr(auth, 'password', None)),
+            tuple(sorted((headers or {}).items())),
+        )
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            response = self.session.get(url, params=params, auth=auth, headers=headers, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def close(self):
+        self.session.close()
+
+
+# The one instance all threads share
+client = APIClient()
@@ -0,0 +1,81 @@
+"""On-disk cache of API responses for the desktop app.
+
+JSON responses that carry an ETag are kept in a SQLite database in the
+user's cache directory, keyed by URL and tagged with the dataset they
+belong to. Requesting the URL again sends If-None-Match, so unchanged data
+comes back as an empty 304 and is read from disk instead. When the server
+cannot be reached the stored copy is used, so datasets opened before stay
+available offline. Least recently used entries are evicted beyond MAX_BYTES.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from PyQt5.QtCore import QStandardPaths
+
+
+def default_path():
+    directory = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return os.path.join(directory, 'chemical-equipment', 'responses.sqlite3')
+
+
+class LocalCache:
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # One connection shared by the worker threads, serialized by the lock
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'url TEXT PRIMARY KEY, dataset_id INTEGER, etag TEXT NOT NULL, '
+                'body BLOB NOT NULL, used_at REAL NOT NULL)'
+            )
+            self.db.execute('CREATE INDEX IF NOT EXISTS responses_dataset_idx ON responses (dataset_id)')
+
+    def get(self, url):
+        """Return (etag, data) stored for url, or None"""
+        with self.lock, self.db:
+            row = self.db.execute('SELECT etag, body FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute('UPDATE responses SET used_at = ? WHERE url = ?', (time.time(), url))
+        etag, body = row
+        return etag, json.loads(zlib.decompress(body))
+
+    def put(self, url, etag, data, dataset_id=None):
+        body = zlib.compress(json.dumps(data).encode())
+        with self.lock, self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses (url, dataset_id, etag, body, used_at) VALUES (?, ?, ?, ?, ?)',
+                (url, dataset_id, etag, body, time.time()),
+            )
+            self.evict()
+
+    def evict(self):
+        total = self.db.execute('SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses').fetchone()[0]
+        if total <= self.MAX_BYTES:
+            return
+        rows = self.db.execute('SELECT url, LENGTH(body) FROM responses ORDER BY used_at').fetchall()
+        stale = []
+        for url, size in rows:
+            if total <= self.MAX_BYTES:
+                break
+            stale.append((url,))
+            total -= size
+        self.db.executemany('DELETE FROM responses WHERE url = ?', stale)
+
+    def forget_dataset(self, dataset_id):
+        with self.lock, self.db:
+            self.db.execute('DELETE FROM responses WHERE dataset_id = ?', (dataset_id,))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,63 +1,505 @@
 import sys
 import os
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlencode
+import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QGridLayout, QLabel, QPushButton, QLineEdit, QGroupBox, 
-                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, 
-                             QMessageBox, QStatusBar, QScrollArea, QSizePolicy)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve
+                             QTableView, QHeaderView, QFileDialog, 
+                             QMessageBox, QStatusBar, QScrollArea, QSizePolicy, QProgressBar)
+from PyQt5.QtCore import (Qt, QTimer, pyqtSignal, QPropertyAnimation, QEasingCurve,
+                          QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool)
 from PyQt5.QtGui import QFont, QPalette, QColor, QLinearGradient, QBrush
 import requests
 from requests.auth import HTTPBasicAuth
+from api_client import client
+from local_cache import LocalCache
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import json
 
 
-class APIWorker(QThread):
-    """Worker thread for API calls"""
-    finished = pyqtSignal(object)  # Changed to object to accept dict, list, or any JSON type
+class APIError(Exception):
+    """An error response from the backend; the message is shown as is"""
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskSignals(QObject):
+    """Signals of a pooled task, which cannot carry its own as QRunnable is not a QObject"""
+    finished = pyqtSignal(object)  # object so any JSON type can be passed
     error = pyqtSignal(str)
+    progress = pyqtSignal(int)
+    session_created = pyqtSignal(str)
+    done = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Work run on the RequestScheduler thread pool.
+
+    Subclasses implement execute(); its return value is emitted with
+    finished and an exception's message with error. A cancelled task is
+    skipped if it has not started and emits neither signal if it has.
+    Long-running file transfers set TRANSFER and get their own threads.
+    """
+    TRANSFER = False
+
+    def __init__(self):
+        super().__init__()
+        # The scheduler holds tasks until they are done and may take queued ones back
+        self.setAutoDelete(False)
+        self.signals = TaskSignals()
+        self.finished = self.signals.finished
+        self.error = self.signals.error
+        self.progress = self.signals.progress
+        self.cancelled = False
+        self.key = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            result = self.execute()
+            if not self.cancelled:
+                self.finished.emit(result)
+        except TaskCancelled:
+            pass
+        except APIError as e:
+            self.fail(str(e))
+        except requests.exceptions.ConnectionError:
+            self.fail("Connection Error: Cannot connect to backend. Make sure Django server is running on http://localhost:8000")
+        except requests.exceptions.Timeout:
+            self.fail("Request timeout: Server took too long to respond")
+        except Exception as e:
+            self.fail(f"Error: {str(e)}")
+        finally:
+            try:
+                self.signals.done.emit()
+            except RuntimeError:
+                # Still running after shutdown: the scheduler and its signals are gone
+                pass
+
+    def fail(self, message):
+        if not self.cancelled:
+            self.error.emit(message)
+
+    @staticmethod
+    def error_message(response):
+        try:
+            return response.json().get('error', f"Error {response.status_code}")
+        except ValueError:
+            return f"Error {response.status_code}: {response.text[:200]}"
+
+    def execute(self):
+        raise NotImplementedError
+
+
+class APIWorker(Task):
+    """A single API call.
+
+    GETs given a LocalCache are revalidated against the stored copy by ETag,
+    and served from it when the server is unreachable.
+    """
 
-    def __init__(self, method, url, auth=None, files=None, data=None):
+    def __init__(self, method, url, auth=None, files=None, data=None, cache=None, dataset_id=None):
         super().__init__()
         self.method = method
         self.url = url
         self.auth = auth
         self.files = files
         self.data = data
+        self.cache = cache
+        self.dataset_id = dataset_id
 
-    def run(self):
+    def execute(self):
+        if self.method == 'GET':
+            cached = self.cache.get(self.url) if self.cache is not None else None
+            headers = {'If-None-Match': cached[0]} if cached else None
+            try:
+                response = client.get(self.url, auth=self.auth, headers=headers, timeout=10)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # Offline: the last copy stored will do
+                if cached is None:
+                    raise
+                return cached[1]
+            if response.status_code == 304 and cached:
+                return cached[1]
+            if response.status_code == 404 and self.cache is not None and self.dataset_id is not None:
+                self.cache.forget_dataset(self.dataset_id)
+        elif self.method == 'POST':
+            response = client.post(self.url, auth=self.auth, files=self.files, data=self.data, timeout=30)
+        else:
+            raise APIError(f"Unsupported method: {self.method}")
+
+        if response.status_code in (200, 201, 202):
+            try:
+                data = response.json()
+            except ValueError:
+                # Response might not be JSON (e.g., empty response)
+                return {}
+            if self.cache is not None and response.status_code == 200 and response.headers.get('ETag'):
+                self.cache.put(self.url, response.headers['ETag'], data, self.dataset_id)
+            return data
+        error_msg = f"Error {response.status_code}"
         try:
-            if self.method == 'GET':
-                response = requests.get(self.url, auth=self.auth, timeout=10)
-            elif self.method == 'POST':
-                response = requests.post(self.url, auth=self.auth, files=self.files, data=self.data, timeout=30)
-            else:
-                self.error.emit(f"Unsupported method: {self.method}")
-                return
+            error_data = response.json()
+            if 'error' in error_data:
+                error_msg = error_data['error']
+        except:
+            error_msg = f"{error_msg}: {response.text[:200]}"
+        raise APIError(error_msg)
 
-            if response.status_code == 200 or response.status_code == 201:
-                try:
-                    self.finished.emit(response.json())
-                except ValueError:
-                    # Response might not be JSON (e.g., empty response)
-                    self.finished.emit({})
-            else:
-                error_msg = f"Error {response.status_code}"
-                try:
-                    error_data = response.json()
-                    if 'error' in error_data:
-                        error_msg = error_data['error']
-                except:
-                    error_msg = f"{error_msg}: {response.text[:200]}"
-                self.error.emit(error_msg)
-        except requests.exceptions.ConnectionError:
-            self.error.emit("Connection Error: Cannot connect to backend. Make sure Django server is running on http://localhost:8000")
-        except requests.exceptions.Timeout:
-            self.error.emit("Request timeout: Server took too long to respond")
-        except Exception as e:
-            self.error.emit(f"Error: {str(e)}")
+
+class ChunkedUploadWorker(Task):
+    """Uploads a file as checksummed chunks, resuming a previous session if given"""
+
+    CHUNK_SIZE = 8 * 1024 * 1024
+    PARALLEL_CHUNKS = 4
+    RETRIES = 3
+
+    def __init__(self, api_base_url, file_path, auth=None, session_id=None):
+        super().__init__()
+        self.api_base_url = api_base_url
+        self.file_path = file_path
+        self.auth = auth
+        self.session_id = session_id
+        self.session_created = self.signals.session_created
+
+    def execute(self):
+        session = self.resume_session() or self.create_session()
+        total = session['total_chunks']
+        missing = [index for index in range(total) if index not in set(session['received'])]
+        done = total - len(missing)
+        self.progress.emit(int(done * 100 / total))
+
+        # Chunks are read from disk one at a time per thread, never the whole file
+        with ThreadPoolExecutor(max_workers=self.PARALLEL_CHUNKS) as pool:
+            futures = [pool.submit(self.send_chunk, session, index) for index in missing]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                self.progress.emit(int(done * 100 / total))
+
+        self.check_cancelled()
+        response = client.post(f"{self.api_base_url}/uploads/{session['id']}/finalize/",
+                               auth=self.auth, timeout=60)
+        if response.status_code != 202:
+            raise APIError(self.error_message(response))
+        return response.json()
+
+    def resume_session(self):
+        if not self.session_id:
+            return None
+        response = client.get(f"{self.api_base_url}/uploads/{self.session_id}/", auth=self.auth, timeout=10)
+        if response.status_code != 200:
+            return None
+        session = response.json()
+        return session if session.get('job') is None else None
+
+    def create_session(self):
+        response = client.post(
+            f"{self.api_base_url}/uploads/",
+            json={
+                'name': os.path.basename(self.file_path),
+                'size': os.path.getsize(self.file_path),
+                'chunk_size': self.CHUNK_SIZE,
+            },
+            auth=self.auth,
+            timeout=10,
+        )
+        if response.status_code != 201:
+            raise APIError(self.error_message(response))
+        session = response.json()
+        self.session_created.emit(session['id'])
+        return session
+
+    def send_chunk(self, session, index):
+        # Chunks still queued when the upload is cancelled are not sent
+        self.check_cancelled()
+        chunk_size = session['chunk_size']
+        with open(self.file_path, 'rb') as f:
+            f.seek(index * chunk_size)
+            body = f.read(chunk_size)
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            'X-Chunk-SHA256': hashlib.sha256(body).hexdigest(),
+        }
+        url = f"{self.api_base_url}/uploads/{session['id']}/chunks/{index}/"
+        for attempt in range(self.RETRIES):
+            try:
+                response = client.put(url, data=body, headers=headers, auth=self.auth, timeout=60)
+                if response.status_code == 200:
+                    return
+                if response.status_code < 500:
+                    raise APIError(self.error_message(response))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.RETRIES - 1:
+                    raise
+            time.sleep(2 ** attempt)
+        raise RuntimeError(f"Chunk {index} failed after {self.RETRIES} attempts")
+
+
+class DownloadWorker(Task):
+    """Streams a file from the API to disk in chunks, reporting percent done.
+
+    The file is written next to save_path and moved into place when
+    complete, so a failed or cancelled download leaves nothing behind.
+    """
+    CHUNK_SIZE = 256 * 1024
+    TRANSFER = True
+
+    def __init__(self, url, save_path, auth=None):
+        super().__init__()
+        self.url = url
+        self.save_path = save_path
+        self.auth = auth
+
+    def execute(self):
+        # Uncompressed, so Content-Length is known and progress can be reported
+        with client.get(self.url, auth=self.auth, stream=True, timeout=(10, 60),
+                        headers={'Accept-Encoding': 'identity'}) as response:
+            if response.status_code != 200:
+                raise APIError(self.error_message(response))
+            total = int(response.headers.get('Content-Length') or 0)
+            part_path = f"{self.save_path}.part"
+            received = 0
+            try:
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        self.check_cancelled()
+                        f.write(chunk)
+                        received += len(chunk)
+                        if total:
+                            self.progress.emit(int(received * 100 / total))
+                os.replace(part_path, self.save_path)
+            except BaseException:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+        return self.save_path
+
+
+class DownloadProgress(QWidget):
+    """Status bar entry for one running download: label, progress bar and cancel button"""
+    cancel_requested = pyqtSignal()
+
+    def __init__(self, label, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel(label))
+        self.bar = QProgressBar()
+        # Busy indicator until the size of the file is known
+        self.bar.setRange(0, 0)
+        self.bar.setMaximumWidth(160)
+        layout.addWidget(self.bar)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.cancel_requested)
+        layout.addWidget(cancel_button)
+
+    def set_progress(self, percent):
+        self.bar.setRange(0, 100)
+        self.bar.setValue(percent)
+
+
+class RequestScheduler(QObject):
+    """Runs API tasks on a bounded thread pool.
+
+    Queued user-initiated tasks start before queued background refreshes.
+    Submitting a task with a key cancels the unfinished task with the same
+    key, so a burst of refreshes only completes the last one. Transfer
+    tasks run on a separate small pool, so slow downloads never hold the
+    threads that API calls need.
+    """
+    USER = 10
+    BACKGROUND = 0
+    MAX_THREADS = 4
+    MAX_TRANSFERS = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.MAX_THREADS)
+        self.transfers = QThreadPool(self)
+        self.transfers.setMaxThreadCount(self.MAX_TRANSFERS)
+        self.tasks = set()
+        self.keyed = {}
+
+    def submit(self, task, priority=USER, key=None):
+        if key is not None:
+            if key in self.keyed:
+                self.cancel(self.keyed[key])
+            self.keyed[key] = task
+            task.key = key
+        self.tasks.add(task)
+        task.signals.done.connect(lambda: self.forget(task))
+        self.pool_for(task).start(task, priority)
+        return task
+
+    def pool_for(self, task):
+        return self.transfers if task.TRANSFER else self.pool
+
+    def cancel(self, task):
+        task.cancel()
+        # A task that has not started yet is dropped from the queue
+        if self.pool_for(task).tryTake(task):
+            self.forget(task)
+
+    def cancel_all(self):
+        for task in list(self.tasks):
+            self.cancel(task)
+
+    def forget(self, task):
+        self.tasks.discard(task)
+        if task.key is not None and self.keyed.get(task.key) is task:
+            del self.keyed[task.key]
+
+    def shutdown(self, timeout_ms=1000):
+        """Cancel everything, then wait at most timeout_ms in total for running requests"""
+        self.cancel_all()
+        started = time.monotonic()
+        if not self.pool.waitForDone(timeout_ms):
+            return False
+        remaining = timeout_ms - int((time.monotonic() - started) * 1000)
+        return self.transfers.waitForDone(max(remaining, 0))
+
+
+class DatasetTableModel(QAbstractTableModel):
+    """Dataset rows stored as one NumPy array per column and fetched from the server page by page.
+
+    The view only asks for the cells it paints, and calls fetchMore as it
+    scrolls towards the last loaded row. fetch_page(dataset_id, params,
+    on_page, on_error) must GET /dataset/<id>/ with params in the background
+    and call on_page with the JSON response or on_error with a message.
+    """
+    page_loaded = pyqtSignal(int, int)  # rows loaded, total rows
+    page_failed = pyqtSignal(str)
+
+    COLUMNS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+    NUMERIC_COLUMNS = {"Flowrate", "Pressure", "Temperature"}
+    PAGE_SIZE = 5000
+
+    def __init__(self, fetch_page, parent=None):
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.dataset_id = None
+        self.sort_key = None
+        self.columns = {}
+        self.total = 0
+        self.loaded = 0
+        self.pending = False
+        # Bumped on every reset so pages requested before it are ignored
+        self.generation = 0
+
+    def load(self, dataset_id):
+        self.dataset_id = dataset_id
+        self.reload()
+
+    def clear(self):
+        self.dataset_id = None
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.generation += 1
+        self.columns = {}
+        self.total = 0
+        self.loaded = 0
+        self.pending = False
+        self.endResetModel()
+        if self.dataset_id is not None:
+            self.request_page()
+
+    def request_page(self):
+        self.pending = True
+        generation = self.generation
+        # The columnar format arrives as {column: [values]}, ready for NumPy
+        params = {'offset': self.loaded, 'limit': self.PAGE_SIZE, 'format': 'columnar'}
+        if self.sort_key:
+            params['sort'] = self.sort_key
+        self.fetch_page(self.dataset_id, params,
+                        lambda page: self.add_page(page, generation),
+                        lambda error: self.fail_page(error, generation))
+
+    def add_page(self, page, generation):
+        if generation != self.generation:
+            return
+        self.pending = False
+        data = page.get('data') or {}
+        if not self.columns:
+            # The first page reports the total, so the arrays are allocated once
+            self.total = page.get('total', 0)
+            self.columns = {
+                name: np.empty(self.total, dtype=float if name in self.NUMERIC_COLUMNS else object)
+                for name in self.COLUMNS
+            }
+        count = min(len(data.get(self.COLUMNS[0], [])), self.total - self.loaded)
+        if count > 0:
+            first = self.loaded
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+            for name, values in self.columns.items():
+                # Missing numbers arrive as null and are stored as NaN
+                values[first:first + count] = np.asarray(data.get(name, [None] * count)[:count], dtype=values.dtype)
+            self.loaded += count
+            self.endInsertRows()
+        self.page_loaded.emit(self.loaded, self.total)
+
+    def fail_page(self, error, generation):
+        if generation != self.generation:
+            return
+        self.pending = False
+        self.page_failed.emit(error)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        name = self.COLUMNS[index.column()]
+        if role == Qt.DisplayRole:
+            value = self.columns[name][index.row()]
+            if name in self.NUMERIC_COLUMNS:
+                return "" if np.isnan(value) else str(value)
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole and name in self.NUMERIC_COLUMNS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.pending and self.loaded < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self.request_page()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort on the server, which keeps a sort index per column, and start again from the first page"""
+        if column < 0:
+            return
+        prefix = "-" if order == Qt.DescendingOrder else ""
+        self.sort_key = prefix + self.COLUMNS[column]
+        if self.dataset_id is not None:
+            self.reload()
 
 
 class ChemicalEquipmentApp(QMainWindow):
@@ -69,9 +511,13 @@ class ChemicalEquipmentApp(QMainWindow):
         self.is_authenticated = False
         self.current_summary = None
         self.current_dataset_id = None
-        self.current_data = None
-        # Store worker references to prevent garbage collection
-        self.active_workers = []
+        # API calls run on a bounded pool instead of a thread per request
+        self.scheduler = RequestScheduler(self)
+        self.downloads = []
+        # Summaries and data pages seen before load from disk after a 304, or offline
+        self.local_cache = LocalCache()
+        # Chunked upload sessions by (path, size, mtime), so a failed upload resumes
+        self.upload_sessions = {}
         self.init_ui()
 
     def init_ui(self):
@@ -146,7 +592,7 @@ class ChemicalEquipmentApp(QMainWindow):
                 border: 2px solid #00d4ff;
                 background: rgba(255, 255, 255, 0.12);
             }
-            QTableWidget {
+            QTableView {
                 background: rgba(255, 255, 255, 0.03);
                 alternate-background-color: rgba(255, 255, 255, 0.06);
                 border: 1px solid rgba(255, 255, 255, 0.1);
@@ -155,11 +601,11 @@ class ChemicalEquipmentApp(QMainWindow):
                 selection-background-color: #00d4ff;
                 gridline-color: rgba(255, 255, 255, 0.05);
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px;
                 border-bottom: 1px solid rgba(255, 255, 255, 0.05);
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: rgba(0, 212, 255, 0.3);
             }
             QHeaderView::section {
@@ -531,11 +977,12 @@ class ChemicalEquipmentApp(QMainWindow):
         table_layout = QVBoxLayout()
         table_layout.setContentsMargins(20, 20, 20, 20)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"
-        ])
+        self.table_model = DatasetTableModel(self.fetch_dataset_page, self)
+        self.table_model.page_loaded.connect(self.on_data_page_loaded)
+        self.table_model.page_failed.connect(
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to load data: {e}"))
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         # Ensure headers are visible
         self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setVisible(True)
@@ -556,7 +1003,9 @@ class ChemicalEquipmentApp(QMainWindow):
         """)
         self.table.setEnabled(False)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        # No sort indicator until the user picks a column, so rows start in file order
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.table.setSortingEnabled(True)
         self.table.setMinimumHeight(200)
         
@@ -600,6 +1049,10 @@ class ChemicalEquipmentApp(QMainWindow):
         self.download_pdf_button.clicked.connect(self.download_pdf)
         self.download_pdf_button.setEnabled(False)
         
+        self.export_csv_button = self.create_styled_button("📥 Export CSV")
+        self.export_csv_button.clicked.connect(self.export_csv)
+        self.export_csv_button.setEnabled(False)
+        
         self.load_history_button = self.create_styled_button("📜 Load History")
         self.load_history_button.clicked.connect(self.load_history)
         self.load_history_button.setEnabled(False)
@@ -615,6 +1068,7 @@ class ChemicalEquipmentApp(QMainWindow):
         
         buttons_layout.addWidget(self.load_data_button)
         buttons_layout.addWidget(self.download_pdf_button)
+        buttons_layout.addWidget(self.export_csv_button)
         buttons_layout.addWidget(self.load_history_button)
         buttons_layout.addWidget(self.refresh_summary_button)
         buttons_layout.addWidget(self.test_charts_button)
@@ -759,22 +1213,10 @@ class ChemicalEquipmentApp(QMainWindow):
                           auth=HTTPBasicAuth(self.username, self.password))
         worker.finished.connect(self.on_login_success)
         worker.error.connect(self.on_login_error)
-        worker.finished.connect(lambda: self.remove_worker(worker))
-        worker.error.connect(lambda: self.remove_worker(worker))
-        self.active_workers.append(worker)
-        worker.start()
+        self.scheduler.submit(worker, key='login')
         
         self.statusBar().showMessage("🔒 Authenticating...")
 
-    def remove_worker(self, worker):
-        """Remove worker from active list and clean up"""
-        if worker in self.active_workers:
-            self.active_workers.remove(worker)
-        if worker.isRunning():
-            worker.quit()
-            worker.wait(1000)  # Wait up to 1 second
-        worker.deleteLater()
-
     def on_login_success(self, data):
         try:
             # Handle both list and dict responses
@@ -821,12 +1263,16 @@ class ChemicalEquipmentApp(QMainWindow):
         self.upload_group.setEnabled(False)
         self.summary_group.setEnabled(False)
         self.table.setEnabled(False)
+        # Nothing requested with the old credentials should land after logout
+        self.scheduler.cancel_all()
+        self.table_model.clear()
         self.login_button.setEnabled(True)
         self.logout_button.setEnabled(False)
         self.username_input.setEnabled(True)
         self.password_input.setEnabled(True)
         self.load_data_button.setEnabled(False)
         self.download_pdf_button.setEnabled(False)
+        self.export_csv_button.setEnabled(False)
         self.load_history_button.setEnabled(False)
         self.refresh_summary_button.setEnabled(False)
         self.username_input.clear()
@@ -850,29 +1296,36 @@ class ChemicalEquipmentApp(QMainWindow):
         self.statusBar().showMessage("📤 Uploading file...")
         self.upload_button.setEnabled(False)
         
-        # Read file content into memory before passing to worker thread
+        # The file is streamed from disk in chunks; a retry after a failure resumes
         try:
-            with open(self.selected_file_path, 'rb') as f:
-                file_content = f.read()
-                files = {'file': (os.path.basename(self.selected_file_path), file_content, 'text/csv')}
-                worker = APIWorker(
-                    'POST',
-                    f"{self.api_base_url}/upload/",
-                    auth=HTTPBasicAuth(self.username, self.password),
-                    files=files
-                )
-                worker.finished.connect(self.on_upload_success)
-                worker.error.connect(self.on_upload_error)
-                worker.finished.connect(lambda: self.remove_worker(worker))
-                worker.error.connect(lambda: self.remove_worker(worker))
-                self.active_workers.append(worker)
-                worker.start()
-        except Exception as e:
+            file_stat = os.stat(self.selected_file_path)
+        except OSError as e:
             self.statusBar().showMessage("🚫 Upload failed")
             QMessageBox.critical(self, "Upload Failed", f"Failed to read file: {str(e)}")
             self.upload_button.setEnabled(True)
+            return
+        upload_key = (self.selected_file_path, file_stat.st_size, file_stat.st_mtime)
+        
+        worker = ChunkedUploadWorker(
+            self.api_base_url,
+            self.selected_file_path,
+            auth=HTTPBasicAuth(self.username, self.password),
+            session_id=self.upload_sessions.get(upload_key)
+        )
+        worker.session_created.connect(lambda session_id: self.upload_sessions.__setitem__(upload_key, session_id))
+        worker.progress.connect(lambda percent: self.statusBar().showMessage(f"📤 Uploading file... {percent}%"))
+        worker.finished.connect(lambda: self.upload_sessions.pop(upload_key, None))
+        worker.finished.connect(self.on_upload_success)
+        worker.error.connect(self.on_upload_error)
+        self.scheduler.submit(worker)
 
     def on_upload_success(self, data):
+        # Large files are parsed in the background; poll the job until it finishes
+        if isinstance(data, dict) and data.get('job_id'):
+            self.statusBar().showMessage("⏳ File accepted, processing on server...")
+            self.poll_upload_job(data['job_id'])
+            return
+        
         try:
             self.statusBar().showMessage("✅ File uploaded successfully!")
             QMessageBox.information(self, "Success", "File uploaded successfully!")
@@ -903,7 +1356,7 @@ class ChemicalEquipmentApp(QMainWindow):
             if not self.current_dataset_id:
                 print("No dataset ID found, loading from latest dataset...")
                 # Load summary which will get the latest dataset
-                self.load_summary()
+                self.load_summary(priority=RequestScheduler.BACKGROUND)
             
             # Update display if we have summary data
             if self.current_summary:
@@ -919,14 +1372,15 @@ class ChemicalEquipmentApp(QMainWindow):
                 print("No summary in response, loading separately...")
                 if self.current_dataset_id:
                     print(f"Loading summary for dataset ID: {self.current_dataset_id}")
-                    self.load_summary(self.current_dataset_id)
+                    self.load_summary(self.current_dataset_id, RequestScheduler.BACKGROUND)
                 else:
                     print("Loading latest summary...")
-                    self.load_summary()  # Load latest
+                    self.load_summary(priority=RequestScheduler.BACKGROUND)  # Load latest
             
             # Enable buttons - enable even if dataset_id is None, user can refresh
             self.load_data_button.setEnabled(True)
             self.download_pdf_button.setEnabled(True)
+            self.export_csv_button.setEnabled(True)
             self.refresh_summary_button.setEnabled(True)
             self.upload_button.setEnabled(True)
             
@@ -941,6 +1395,27 @@ class ChemicalEquipmentApp(QMainWindow):
             self.load_data_button.setEnabled(True)
             self.refresh_summary_button.setEnabled(True)
 
+    def poll_upload_job(self, job_id):
+        worker = APIWorker(
+            'GET',
+            f"{self.api_base_url}/jobs/{job_id}/",
+            auth=HTTPBasicAuth(self.username, self.password)
+        )
+        worker.finished.connect(self.on_upload_job_status)
+        worker.error.connect(self.on_upload_error)
+        self.scheduler.submit(worker, RequestScheduler.BACKGROUND, key='upload-job')
+
+    def on_upload_job_status(self, job):
+        if job.get('status') == 'succeeded':
+            # Same path as a synchronous upload, minus the inline summary
+            self.on_upload_success({'dataset': {'id': job.get('dataset')}})
+        elif job.get('status') == 'failed':
+            self.on_upload_error(job.get('error') or 'Processing failed')
+        else:
+            progress = int((job.get('progress') or 0) * 100)
+            self.statusBar().showMessage(f"⏳ Processing on server... {progress}%")
+            QTimer.singleShot(1000, lambda: self.poll_upload_job(job['id']))
+
     def on_upload_error(self, error):
         self.statusBar().showMessage("🚫 Upload failed")
         QMessageBox.critical(self, "Upload Failed", f"Upload failed: {error}")
@@ -1028,19 +1503,17 @@ class ChemicalEquipmentApp(QMainWindow):
             import traceback
             traceback.print_exc()
     
-    def load_summary(self, dataset_id=None):
+    def load_summary(self, dataset_id=None, priority=RequestScheduler.USER):
         try:
             url = f"{self.api_base_url}/summary/"
             if dataset_id:
                 url = f"{self.api_base_url}/summary/{dataset_id}/"
             
-            worker = APIWorker('GET', url, auth=HTTPBasicAuth(self.username, self.password))
+            worker = APIWorker('GET', url, auth=HTTPBasicAuth(self.username, self.password),
+                               cache=self.local_cache, dataset_id=dataset_id)
             worker.finished.connect(self.on_summary_loaded)
             worker.error.connect(self.on_summary_error)
-            worker.finished.connect(lambda: self.remove_worker(worker))
-            worker.error.connect(lambda: self.remove_worker(worker))
-            self.active_workers.append(worker)
-            worker.start()
+            self.scheduler.submit(worker, priority, key='summary')
         except Exception as e:
             print(f"Error in load_summary: {e}")
             import traceback
@@ -1059,6 +1532,8 @@ class ChemicalEquipmentApp(QMainWindow):
         try:
             print(f"Summary loaded successfully: {data}")
             self.current_summary = data
+            if data.get('dataset_id'):
+                self.current_dataset_id = data['dataset_id']
             print(f"Current summary set: {self.current_summary}")
             
             # Update displays
@@ -1231,108 +1706,101 @@ class ChemicalEquipmentApp(QMainWindow):
             traceback.print_exc()
 
     def load_dataset_data(self):
+        # The summary on screen names its dataset, which saves asking history for it
+        if not self.current_dataset_id and self.current_summary:
+            self.current_dataset_id = self.current_summary.get('dataset_id')
         # If no dataset_id, try to get it from the latest dataset
         if not self.current_dataset_id:
             # First get the latest dataset ID from history
             self.statusBar().showMessage("🕰️ Getting latest dataset...")
             worker = APIWorker(
                 'GET',
-                f"{self.api_base_url}/history/",
-                auth=HTTPBasicAuth(self.username, self.password)
+                f"{self.api_base_url}/history/?limit=1&include_distributions=false",
+                auth=HTTPBasicAuth(self.username, self.password),
+                cache=self.local_cache
             )
             worker.finished.connect(self.on_history_for_dataset_id)
             worker.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to get dataset: {e}"))
-            worker.finished.connect(lambda: self.remove_worker(worker))
-            worker.error.connect(lambda: self.remove_worker(worker))
-            self.active_workers.append(worker)
-            worker.start()
+            self.scheduler.submit(worker, key='latest-dataset')
             return
         
         self.statusBar().showMessage("📊 Loading dataset data...")
-        
+        self.table_model.load(self.current_dataset_id)
+    
+    def fetch_dataset_page(self, dataset_id, params, on_page, on_error):
         worker = APIWorker(
             'GET',
-            f"{self.api_base_url}/dataset/{self.current_dataset_id}/",
-            auth=HTTPBasicAuth(self.username, self.password)
+            f"{self.api_base_url}/dataset/{dataset_id}/?{urlencode(params)}",
+            auth=HTTPBasicAuth(self.username, self.password),
+            cache=self.local_cache,
+            dataset_id=dataset_id
         )
-        worker.finished.connect(self.on_data_loaded)
-        worker.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to load data: {e}"))
-        worker.finished.connect(lambda: self.remove_worker(worker))
-        worker.error.connect(lambda: self.remove_worker(worker))
-        self.active_workers.append(worker)
-        worker.start()
+        worker.finished.connect(on_page)
+        worker.error.connect(on_error)
+        self.scheduler.submit(worker, key='dataset-page')
     
     def on_history_for_dataset_id(self, data):
         """Get dataset ID from history and then load data"""
-        if isinstance(data, list) and len(data) > 0:
-            self.current_dataset_id = data[0].get('id')
+        datasets = data.get('results', []) if isinstance(data, dict) else []
+        if datasets:
+            self.current_dataset_id = datasets[0].get('id')
             print(f"Got dataset ID from history: {self.current_dataset_id}")
             # Now load the data
             self.load_dataset_data()  # Recursive call, but now with dataset_id
         else:
             QMessageBox.warning(self, "Error", "No datasets available. Please upload a CSV file first.")
 
-    def on_data_loaded(self, data):
-        self.current_data = data.get('data', [])
-        
-        if not self.current_data:
+    def on_data_page_loaded(self, loaded, total):
+        if not total:
             QMessageBox.warning(self, "Warning", "No data available")
             return
-        
-        self.table.setRowCount(len(self.current_data))
-        
-        for row_idx, row_data in enumerate(self.current_data):
-            self.table.setItem(row_idx, 0, QTableWidgetItem(str(row_data.get('Equipment Name', ''))))
-            self.table.setItem(row_idx, 1, QTableWidgetItem(str(row_data.get('Type', ''))))
-            self.table.setItem(row_idx, 2, QTableWidgetItem(str(row_data.get('Flowrate', ''))))
-            self.table.setItem(row_idx, 3, QTableWidgetItem(str(row_data.get('Pressure', ''))))
-            self.table.setItem(row_idx, 4, QTableWidgetItem(str(row_data.get('Temperature', ''))))
-        
-        # Ensure headers are visible and properly styled
-        self.table.horizontalHeader().setVisible(True)
-        self.table.verticalHeader().setVisible(False)
-        
-        # Resize columns to fit content
-        self.table.resizeColumnsToContents()
-        # Ensure minimum column width
-        for col in range(5):
-            if self.table.columnWidth(col) < 120:
-                self.table.setColumnWidth(col, 120)
-        
-        # Force header update
-        self.table.horizontalHeader().update()
-        
-        self.statusBar().showMessage(f"📊 Loaded {len(self.current_data)} records")
+        self.statusBar().showMessage(f"📊 Loaded {loaded} of {total} records")
 
     def download_pdf(self):
         if not self.current_dataset_id:
             QMessageBox.warning(self, "Error", "No dataset selected")
             return
         
-        self.statusBar().showMessage("📄 Generating PDF report...")
+        save_path, _ = QFileDialog.getSaveFileName(
+            self, "Save PDF Report", f"equipment_report_{self.current_dataset_id}.pdf",
+            "PDF Files (*.pdf)"
+        )
+        if save_path:
+            self.start_download(f"{self.api_base_url}/report/{self.current_dataset_id}/", save_path, "📄 PDF report")
+
+    def export_csv(self):
+        if not self.current_dataset_id:
+            QMessageBox.warning(self, "Error", "No dataset selected")
+            return
         
-        try:
-            response = requests.get(
-                f"{self.api_base_url}/report/{self.current_dataset_id}/",
-                auth=HTTPBasicAuth(self.username, self.password),
-                stream=True
-            )
-            
-            if response.status_code == 200:
-                save_path, _ = QFileDialog.getSaveFileName(
-                    self, "Save PDF Report", f"equipment_report_{self.current_dataset_id}.pdf",
-                    "PDF Files (*.pdf)"
-                )
-                
-                if save_path:
-                    with open(save_path, 'wb') as f:
-                        f.write(response.content)
-                    QMessageBox.information(self, "Success", f"PDF report saved to {save_path}")
-                    self.statusBar().showMessage("✅ PDF report generated successfully")
-            else:
-                QMessageBox.critical(self, "Error", f"Failed to generate PDF: {response.text}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to download PDF: {str(e)}")
+        save_path, _ = QFileDialog.getSaveFileName(
+            self, "Export CSV", f"equipment_data_{self.current_dataset_id}.csv",
+            "CSV Files (*.csv)"
+        )
+        if save_path:
+            self.start_download(f"{self.api_base_url}/dataset/{self.current_dataset_id}/csv/", save_path, "📥 CSV export")
+
+    def start_download(self, url, save_path, label):
+        """Download url to save_path in the background, with progress and cancel in the status bar"""
+        worker = DownloadWorker(url, save_path, auth=HTTPBasicAuth(self.username, self.password))
+        panel = DownloadProgress(label)
+        self.downloads.append(panel)
+        self.statusBar().addPermanentWidget(panel)
+        
+        worker.progress.connect(panel.set_progress)
+        worker.finished.connect(lambda path: self.finish_download(panel, f"✅ {label} saved to {path}"))
+        worker.error.connect(lambda e: self.finish_download(panel, f"🚫 {label} failed"))
+        worker.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Download failed: {e}"))
+        panel.cancel_requested.connect(lambda: self.scheduler.cancel(worker))
+        panel.cancel_requested.connect(lambda: self.finish_download(panel, f"🚫 {label} cancelled"))
+        self.scheduler.submit(worker)
+
+    def finish_download(self, panel, message):
+        if panel in self.downloads:
+            self.downloads.remove(panel)
+            self.statusBar().removeWidget(panel)
+            panel.deleteLater()
+        self.statusBar().showMessage(message)
 
     def load_history(self):
         self.statusBar().showMessage("📜 Loading history...")
@@ -1344,12 +1812,10 @@ class ChemicalEquipmentApp(QMainWindow):
         )
         worker.finished.connect(self.on_history_loaded)
         worker.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to load history: {e}"))
-        worker.finished.connect(lambda: self.remove_worker(worker))
-        worker.error.connect(lambda: self.remove_worker(worker))
-        self.active_workers.append(worker)
-        worker.start()
+        self.scheduler.submit(worker, key='history')
 
     def on_history_loaded(self, data):
+        data = data.get('results', [])
         if not data:
             QMessageBox.information(self, "Info", "No history available")
             return
@@ -1371,14 +1837,10 @@ class ChemicalEquipmentApp(QMainWindow):
         self.statusBar().showMessage("📊 History loaded")
     
     def closeEvent(self, event):
-        """Handle application close - wait for all threads to finish"""
-        # Wait for all active workers to finish
-        for worker in self.active_workers[:]:  # Copy list to avoid modification during iteration
-            if worker.isRunning():
-                worker.quit()
-                worker.wait(2000)  # Wait up to 2 seconds for each worker
-            worker.deleteLater()
-        self.active_workers.clear()
+        """Handle application close - cancel pending requests without waiting on each one"""
+        self.scheduler.shutdown()
+        client.close()
+        self.local_cache.close()
         event.accept()
 
 
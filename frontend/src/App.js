@@ -28,6 +28,8 @@ ChartJS.register(
 );
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+// Rows fetched per request for the data table
+const ROWS_PAGE_SIZE = 1000;
 
 function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
@@ -37,6 +39,7 @@ function App() {
   const [summary, setSummary] = useState(null);
   const [history, setHistory] = useState([]);
   const [datasetData, setDatasetData] = useState(null);
+  const [datasetPage, setDatasetPage] = useState({ total: 0, nextOffset: null });
   const [currentDatasetId, setCurrentDatasetId] = useState(null);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
@@ -109,6 +112,7 @@ function App() {
     setSummary(null);
     setHistory([]);
     setDatasetData(null);
+    setDatasetPage({ total: 0, nextOffset: null });
     setCurrentDatasetId(null);
   };
 
@@ -138,12 +142,21 @@ function App() {
         },
       });
 
+      // Large files are processed in the background (202 + job id)
+      let datasetId;
+      if (response.status === 202) {
+        setSuccess('File accepted, processing on server...');
+        datasetId = await waitForJob(response.data.job_id);
+      } else {
+        setSummary(response.data.summary);
+        datasetId = response.data.dataset.id;
+      }
+
       setSuccess('File uploaded successfully!');
-      setSummary(response.data.summary);
-      setCurrentDatasetId(response.data.dataset.id);
+      setCurrentDatasetId(datasetId);
       
       // Automatically load the full dataset data and charts
-      await loadDatasetData(response.data.dataset.id);
+      await loadDatasetData(datasetId);
       
       // Load history to show updated list
       await loadHistory();
@@ -157,6 +170,20 @@ function App() {
     }
   };
 
+  const waitForJob = async (jobId) => {
+    for (;;) {
+      const { data: job } = await api.get(`/jobs/${jobId}/`);
+      if (job.status === 'succeeded') {
+        return job.dataset;
+      }
+      if (job.status === 'failed') {
+        throw { response: { data: { error: job.error || 'Processing failed' } } };
+      }
+      setSuccess(`Processing on server... ${Math.round(job.progress * 100)}%`);
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const loadSummary = async (datasetId = null) => {
     try {
       const url = datasetId ? `/summary/${datasetId}/` : '/summary/';
@@ -175,7 +202,7 @@ function App() {
   const loadHistory = async () => {
     try {
       const response = await api.get('/history/');
-      setHistory(response.data);
+      setHistory(response.data.results);
     } catch (err) {
       console.error('Failed to load history:', err);
     }
@@ -183,8 +210,11 @@ function App() {
 
   const loadDatasetData = async (datasetId) => {
     try {
-      const response = await api.get(`/dataset/${datasetId}/`);
+      const response = await api.get(`/dataset/${datasetId}/`, {
+        params: { limit: ROWS_PAGE_SIZE },
+      });
       setDatasetData(response.data.data);
+      setDatasetPage({ total: response.data.total, nextOffset: response.data.next_offset });
       setCurrentDatasetId(datasetId);
       await loadSummary(datasetId);
     } catch (err) {
@@ -192,6 +222,18 @@ function App() {
     }
   };
 
+  const loadMoreRows = async () => {
+    try {
+      const response = await api.get(`/dataset/${currentDatasetId}/`, {
+        params: { offset: datasetPage.nextOffset, limit: ROWS_PAGE_SIZE },
+      });
+      setDatasetData((rows) => rows.concat(response.data.data));
+      setDatasetPage({ total: response.data.total, nextOffset: response.data.next_offset });
+    } catch (err) {
+      setError('Failed to load more rows');
+    }
+  };
+
   const downloadPDF = async (datasetId) => {
     try {
       const response = await api.get(`/report/${datasetId}/`, {
@@ -422,6 +464,14 @@ function App() {
                   ))}
                 </tbody>
               </table>
+              <div className="action-buttons">
+                <span>Showing {datasetData.length} of {datasetPage.total} rows</span>
+                {datasetPage.nextOffset !== null && (
+                  <button onClick={loadMoreRows} className="action-button">
+                    Load More Rows
+                  </button>
+                )}
+              </div>
             </div>
           )}
         </>